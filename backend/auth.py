@@ -0,0 +1,164 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AdminUserDB, get_read_database
+
+ROOT_DIR = Path(__file__).parent
+
+ADMIN_SESSION_HOURS = float(os.environ.get("ADMIN_SESSION_HOURS", "12"))
+# Generated on first start and shared by all workers through this file
+# unless ADMIN_SESSION_SECRET is set
+SESSION_SECRET_FILE = ROOT_DIR / ".session_secret"
+
+# scrypt cost: 2**14 * 8 * 128 bytes = 16 MiB per hash
+SCRYPT_N = int(os.environ.get("SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = 8
+SCRYPT_P = 1
+# Cap concurrent hashes so a login burst cannot exhaust memory or threads
+KDF_CONCURRENCY = int(os.environ.get("KDF_CONCURRENCY", str(os.cpu_count() or 2)))
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def load_session_secret() -> bytes:
+    secret = os.environ.get("ADMIN_SESSION_SECRET")
+    if secret:
+        return secret.encode()
+    try:
+        # O_EXCL: when several workers start together only one writes the file
+        fd = os.open(SESSION_SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        for _ in range(50):
+            secret = SESSION_SECRET_FILE.read_bytes().strip()
+            if secret:
+                return secret
+            time.sleep(0.01)
+        raise RuntimeError(f"{SESSION_SECRET_FILE} is empty")
+    secret = secrets.token_hex(32).encode()
+    with os.fdopen(fd, "wb") as out:
+        out.write(secret)
+    return secret
+
+_session_secret: Optional[bytes] = None
+
+def _secret() -> bytes:
+    global _session_secret
+    if _session_secret is None:
+        _session_secret = load_session_secret()
+    return _session_secret
+
+# Session tokens
+
+def create_session_token(admin_id: str, token_version: int,
+                         ttl_seconds: float = ADMIN_SESSION_HOURS * 3600) -> Tuple[str, int]:
+    """Return a signed `payload.signature` token and its expiry (unix time)
+
+    `token_version` is the admin's current AdminUserDB.token_version; bumping
+    that column revokes every token issued before.
+    """
+    expires_at = int(time.time() + ttl_seconds)
+    claims = {"sub": admin_id, "ver": token_version, "exp": expires_at}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signature = _b64encode(hmac.new(_secret(), payload.encode(), hashlib.sha256).digest())
+    return f"{payload}.{signature}", expires_at
+
+def verify_session_token(token: str) -> Optional[dict]:
+    """Claims of a valid, unexpired token; None otherwise. No DB access."""
+    payload, _, signature = token.partition(".")
+    expected = _b64encode(hmac.new(_secret(), payload.encode(), hashlib.sha256).digest())
+    if not signature or not hmac.compare_digest(signature, expected):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+        return None
+    return claims
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+async def optional_admin(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_read_database),
+) -> Optional[dict]:
+    """Claims of a valid token whose admin still exists, is active and has not revoked it"""
+    if credentials is None:
+        return None
+    claims = verify_session_token(credentials.credentials)
+    if claims is None:
+        return None
+    result = await db.execute(
+        select(AdminUserDB.token_version).where(
+            AdminUserDB.id == claims.get("sub"),
+            AdminUserDB.is_active == True
+        )
+    )
+    if result.scalar_one_or_none() != claims.get("ver", -1):
+        return None
+    return claims
+
+def require_admin(admin: Optional[dict] = Depends(optional_admin)) -> dict:
+    if admin is None:
+        raise HTTPException(
+            status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"}
+        )
+    return admin
+
+# Password hashing
+
+_kdf_slots: Optional[asyncio.Semaphore] = None
+
+def _kdf_semaphore() -> asyncio.Semaphore:
+    global _kdf_slots
+    if _kdf_slots is None:
+        _kdf_slots = asyncio.Semaphore(KDF_CONCURRENCY)
+    return _kdf_slots
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=32)
+
+def _hash_password_sync(password: str) -> str:
+    salt = secrets.token_bytes(16)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(digest)}"
+
+def _verify_password_sync(password: str, stored: str) -> bool:
+    if not stored.startswith("scrypt$"):
+        # Legacy unsalted SHA-256 hex digest
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    try:
+        _, n, r, p, salt, digest = stored.split("$")
+        candidate = _scrypt(password, _b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(candidate, _b64decode(digest))
+
+def needs_rehash(stored: str) -> bool:
+    return not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+async def hash_password(password: str) -> str:
+    async with _kdf_semaphore():
+        return await asyncio.to_thread(_hash_password_sync, password)
+
+async def verify_password(password: str, stored: Optional[str]) -> bool:
+    """Check a password off the event loop; stored=None still spends the same time"""
+    async with _kdf_semaphore():
+        if stored is None:
+            await asyncio.to_thread(_hash_password_sync, password)
+            return False
+        return await asyncio.to_thread(_verify_password_sync, password, stored)
@@ -0,0 +1,100 @@
+"""Compare the model-based and row-based JSON paths for list endpoints.
+
+    cd backend && python bench_json.py [rows ...]
+
+The old path builds a Pydantic model per row, validates the list against the
+response_model and encodes it as FastAPI does; the new path encodes the
+selected rows directly (see fast_json.py). Runs against an in-memory SQLite
+database so only loading and serialization are measured.
+"""
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from database import Base, BlogPostDB, ContactMessageDB, TranslationDB, LANGUAGES
+from fast_json import dumps, orjson, rows_to_dicts
+from server import BlogPost, ContactMessage, blog_query, db_to_pydantic_blog, db_to_pydantic_message
+
+REPEAT = 5
+
+def make_rows(count: int):
+    start = datetime(2024, 1, 1)
+    messages = [
+        ContactMessageDB(
+            id=str(uuid.uuid4()), name=f"Client {i}", email=f"client{i}@example.com", phone="+90 555 000 00 00",
+            subject="Kredi sözleşmesi hakkında", legal_area="banking_finance", urgency="medium",
+            message="Merhaba, sözleşme taslağını incelemenizi rica ediyoruz. " * 8,
+            created_at=start + timedelta(minutes=i), is_read=i % 3 == 0,
+        )
+        for i in range(count)
+    ]
+    posts = [
+        BlogPostDB(
+            id=str(uuid.uuid4()), slug=f"post-{i}",
+            published=True, created_at=start + timedelta(minutes=i), updated_at=start + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+    translations = [
+        TranslationDB(entity_id=post.id, lang=lang, field=field, value=value)
+        for i, post in enumerate(posts)
+        for lang in LANGUAGES
+        for field, value in (
+            ("title", f"Proje finansmanı {i} ({lang})"),
+            ("content", "Lorem ipsum dolor sit amet, ağır şartlar. " * 60),
+        )
+    ]
+    return messages, posts, translations
+
+async def best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+async def run(count: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    messages, posts, translations = make_rows(count)
+    async with sessions() as db:
+        db.add_all(messages + posts + translations)
+        await db.commit()
+
+    cases = [
+        ("messages", select(ContactMessageDB.__table__), ContactMessage, db_to_pydantic_message),
+        ("blog posts", blog_query(), BlogPost, db_to_pydantic_blog),
+    ]
+    for label, query, response_model, to_pydantic in cases:
+        adapter = TypeAdapter(List[response_model])
+
+        async def old_path():
+            async with sessions() as db:
+                items = [to_pydantic(row) for row in (await db.execute(query)).all()]
+            validated = adapter.validate_python(items, from_attributes=True)
+            return JSONResponse(jsonable_encoder(validated)).body
+
+        async def new_path():
+            async with sessions() as db:
+                rows = rows_to_dicts((await db.execute(query)).mappings())
+            return dumps(rows)
+
+        old = await best_of(old_path)
+        new = await best_of(new_path)
+        print(f"{count:>6} {label:<11} old {old * 1000:8.1f} ms   new {new * 1000:8.1f} ms   {old / new:4.1f}x")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    print(f"encoder: {'orjson' if orjson else 'json'}, best of {REPEAT}")
+    for count in [int(arg) for arg in sys.argv[1:]] or [1000, 10000]:
+        asyncio.run(run(count))
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import CacheVersionDB
+from http_cache import is_not_modified, not_modified_response
+from metrics import registry, route_label
+
+# How long a worker trusts its last read of the shared version table (seconds).
+# Writes in this worker invalidate immediately; other gunicorn workers notice
+# within this window.
+CACHE_VERSION_CHECK_INTERVAL = float(os.environ.get("CACHE_VERSION_CHECK_INTERVAL", "1.0"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+async def bump_cache_version(db: AsyncSession, *tags: str):
+    """Increment the tags' shared versions as part of the caller's transaction"""
+    await db.execute(
+        insert(CacheVersionDB)
+        .values([{"tag": tag, "version": 1} for tag in tags])
+        .on_conflict_do_update(
+            index_elements=[CacheVersionDB.tag],
+            set_={"version": CacheVersionDB.version + 1}
+        )
+    )
+
+class CacheVersions:
+    """Per-worker view of the cache_versions table, refreshed at most once per interval"""
+
+    def __init__(self, check_interval: float = CACHE_VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._versions: Dict[str, int] = {}
+        self._checked_at: Optional[float] = None
+
+    async def get(self, db: AsyncSession, tag: str) -> int:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            result = await db.execute(select(CacheVersionDB.tag, CacheVersionDB.version))
+            self._versions = dict(result.all())
+            self._checked_at = now
+        return self._versions.get(tag, 0)
+
+    def expire(self):
+        """Force the next lookup to re-read the shared versions"""
+        self._checked_at = None
+
+class CachedResponse:
+    __slots__ = ("body", "status_code", "headers", "versions", "size")
+
+    def __init__(self, body: bytes, status_code: int, headers: Dict[str, str], versions: Dict[str, int]):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers
+        self.versions = versions
+        self.size = len(body) + sum(len(k) + len(v) for k, v in headers.items())
+
+class ResponseCache:
+    """Encoded GET responses keyed by path and normalized query, invalidated by tag.
+
+    Each entry records the versions of its tags (e.g. "blog", "blog:<id>",
+    "settings") when it was built; a write bumps the tag in the shared
+    cache_versions table, which makes the entry stale in every worker. Memory
+    is bounded by entry count and body bytes, evicting the least recently
+    used. Concurrent misses for one key wait for a single build.
+    """
+
+    def __init__(self, versions: CacheVersions, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.versions = versions
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    @staticmethod
+    def key(request: Request) -> Tuple:
+        return (request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+    async def get_or_build(self, request: Request, db: AsyncSession, tags: Iterable[str],
+                           build: Callable[[], Awaitable[Response]]) -> Response:
+        """The cached response for this request, or `build()`'s, stored if it is a 200"""
+        # Versions are read before building, so a write that lands during the
+        # build leaves the entry stale rather than wrong
+        versions = {tag: await self.versions.get(db, tag) for tag in tags}
+        key = self.key(request)
+        entry = self._entries.get(key)
+        if entry is not None and entry.versions == versions:
+            self._entries.move_to_end(key)
+            self._count(request, "hit")
+            return self._respond(request, entry)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count(request, "coalesced")
+            entry, error = await asyncio.shield(inflight)
+            if error is not None:
+                raise error
+            if entry is not None:
+                return self._respond(request, entry)
+            return await build()
+
+        self._count(request, "miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        entry = None
+        try:
+            response = await build()
+            if response.status_code == 200 and not isinstance(response, StreamingResponse):
+                entry = CachedResponse(
+                    response.body,
+                    response.status_code,
+                    {name: value for name, value in response.headers.items() if name != "content-length"},
+                    versions,
+                )
+                self._store(key, entry)
+            future.set_result((entry, None))
+            return response
+        except Exception as error:
+            future.set_result((None, error))
+            raise
+        finally:
+            del self._inflight[key]
+            if not future.done():
+                # Cancelled: waiters build for themselves
+                future.set_result((None, None))
+
+    def _respond(self, request: Request, entry: CachedResponse) -> Response:
+        etag = entry.headers.get("etag")
+        last_modified = entry.headers.get("last-modified")
+        if last_modified:
+            last_modified = parsedate_to_datetime(last_modified)
+        if etag and is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        return Response(content=entry.body, status_code=entry.status_code, headers=entry.headers)
+
+    def _store(self, key: Tuple, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            registry.inc("response_cache_evictions_total")
+        registry.set("response_cache_bytes", self._bytes)
+        registry.set("response_cache_entries", len(self._entries))
+
+    def _count(self, request: Request, result: str):
+        # "coalesced": a miss that waited for another request's build
+        registry.inc("response_cache_requests_total", (route_label(request.scope), result))
+
+cache_versions = CacheVersions()
+response_cache = ResponseCache(cache_versions)
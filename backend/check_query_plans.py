@@ -0,0 +1,136 @@
+"""Check that the hot read endpoints run on indexes.
+
+    cd backend && python check_query_plans.py
+
+Calls the public and admin list/detail endpoints against a seeded temporary
+database, records every SELECT they issue and runs EXPLAIN QUERY PLAN on it.
+Exits non-zero if a plan scans a table without an index or sorts through a
+temp B-tree, printing the offending plans. Run it after changing queries or
+indexes.
+"""
+import asyncio
+import logging
+import sys
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from auth import create_session_token
+from bench_json import make_rows
+from database import AdminUserDB, Base, SiteSettingsDB, apply_migrations, get_database, get_read_database
+from search import create_search_tables
+from server import app
+
+ROWS = 2000
+
+# Single-row or tag tables that are read whole by design
+FULL_READ_TABLES = ("cache_versions", "site_settings")
+
+def requests(post_slug: str, post_id: str):
+    return [
+        "/api/blog",
+        "/api/blog?limit=10",
+        "/api/blog?include_content=false&limit=10",
+        "/api/blog?lang=en&include_content=false&limit=10",
+        "/api/blog?lang=en&limit=10&cursor={blog_cursor}",
+        f"/api/blog/by-slug/{post_slug}?lang=en",
+        f"/api/blog/{post_id}",
+        "/api/settings",
+        "/api/settings?lang=en",
+        "/api/messages?limit=50",
+        "/api/messages?limit=50&cursor={messages_cursor}",
+        "/api/messages?limit=50&is_read=false",
+        "/api/messages/stats",
+    ]
+
+def plan_problems(plan) -> list:
+    problems = []
+    for detail in plan:
+        if "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif detail.startswith("SCAN ") and "INDEX" not in detail and "CONSTANT ROW" not in detail:
+            table = detail.split()[1]
+            if table not in FULL_READ_TABLES:
+                problems.append(detail)
+    return problems
+
+async def seed(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await apply_migrations(conn)
+        await create_search_tables(conn)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    messages, posts, translations = make_rows(ROWS)
+    async with sessions() as db:
+        # Present up front, or the settings endpoint would create it in the real database
+        now = datetime(2024, 1, 1)
+        db.add(SiteSettingsDB(id=str(uuid.uuid4()), logo_url="", created_at=now, updated_at=now))
+        # Admin tokens are checked against this row
+        db.add(AdminUserDB(id="query-plans", username="query-plans", password_hash="", created_at=now))
+        db.add_all(messages + posts + translations)
+        await db.commit()
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+    return sessions, posts[0]
+
+async def explain(engine, statements) -> int:
+    failures = 0
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = [row[3] for row in result]
+            problems = plan_problems(plan)
+            if problems:
+                failures += 1
+                print(f"FAIL {' '.join(statement.split())[:200]}")
+                for detail in plan:
+                    print(f"     {detail}")
+    return failures
+
+def main() -> int:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(directory) / 'plans.db'}")
+        sessions, post = asyncio.run(seed(engine))
+
+        statements = {}
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                statements.setdefault(statement, parameters)
+
+        async def session():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_database] = session
+        app.dependency_overrides[get_read_database] = session
+        token, _ = create_session_token("query-plans", 0)
+        headers = {"Authorization": f"Bearer {token}"}
+        # No context manager: startup would open the real database
+        client = TestClient(app)
+        try:
+            cursors = {
+                "blog_cursor": client.get("/api/blog?lang=en&limit=10").headers["x-next-cursor"],
+                "messages_cursor": client.get("/api/messages?limit=50", headers=headers).headers["x-next-cursor"],
+            }
+            for path in requests(post.slug, post.id):
+                response = client.get(path.format(**cursors), headers=headers)
+                if response.status_code != 200:
+                    print(f"FAIL GET {path}: HTTP {response.status_code}")
+                    return 1
+        finally:
+            app.dependency_overrides.clear()
+
+        # The engine was used from the client's event loop; explain from a fresh one
+        failures = asyncio.run(explain(engine, list(statements.items())))
+        asyncio.run(engine.dispose())
+    print(f"{len(statements)} statements checked, {failures} with unindexed scans or sorts")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Check that concurrent writes from several gunicorn workers all land.
+
+    cd backend && python check_write_contention.py [workers] [messages]
+
+Copies the backend into a temporary directory (so the real database is not
+touched), starts it under gunicorn with several UvicornWorker processes and
+fires concurrent POST /api/messages, once with direct writes and once with
+MESSAGE_WRITE_BEHIND. Exits non-zero if any request fails, a worker logs
+"database is locked", or the number of stored rows differs from the number
+of accepted requests.
+"""
+import json
+import os
+import shutil
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+CONCURRENCY = 32
+STARTUP_TIMEOUT = 30
+
+MESSAGE = {
+    "name": "Contention Check",
+    "email": "check@example.com",
+    "phone": "+90 555 000 00 00",
+    "subject": "Write contention",
+    "legal_area": "other",
+    "urgency": "low",
+    "message": "Sent by check_write_contention.py",
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def post_message(base_url: str) -> int:
+    request = urllib.request.Request(
+        f"{base_url}/api/messages",
+        data=json.dumps(MESSAGE).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+def wait_until_up(base_url: str, server: subprocess.Popen):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/health", timeout=2):
+                return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError("gunicorn did not start in time")
+
+def run(app_dir: Path, workers: int, messages: int, write_behind: bool) -> bool:
+    label = "write-behind" if write_behind else "direct"
+    database = app_dir / "hancer_law.db"
+    for path in app_dir.glob("hancer_law.db*"):
+        path.unlink()
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "MESSAGE_WRITE_BEHIND": "true" if write_behind else "false",
+        # Every request comes from one address
+        "RATE_LIMIT_ENABLED": "false",
+        "PRERENDER_DIR": str(app_dir / "prerendered"),
+        "DATA_DIR": str(app_dir),
+    }
+    log_path = app_dir / f"gunicorn-{label}.log"
+    with open(log_path, "w") as log:
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn", "server:app",
+                "-w", str(workers), "-k", "uvicorn.workers.UvicornWorker",
+                "-b", f"127.0.0.1:{port}", "--graceful-timeout", "10",
+            ],
+            cwd=app_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        try:
+            wait_until_up(base_url, server)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(CONCURRENCY) as pool:
+                statuses = list(pool.map(lambda _: post_message(base_url), range(messages)))
+            elapsed = time.perf_counter() - started
+        finally:
+            # A graceful stop also drains the write-behind queues
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    accepted = statuses.count(200)
+    failed = {status: statuses.count(status) for status in set(statuses) if status != 200}
+    locked = log_path.read_text(errors="replace").count("database is locked")
+    with sqlite3.connect(database) as conn:
+        stored = conn.execute("SELECT count(*) FROM contact_messages").fetchone()[0]
+
+    ok = not failed and not locked and stored == accepted == messages
+    print(
+        f"{label:<12} {workers} workers  {messages} POSTs in {elapsed:.1f} s  "
+        f"accepted {accepted}  stored {stored}  failed {failed or 0}  'database is locked' {locked}  "
+        f"{'OK' if ok else 'FAIL'}"
+    )
+    if not ok:
+        print(f"             see {log_path}")
+    return ok
+
+def main() -> int:
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as directory:
+        app_dir = Path(directory) / "backend"
+        shutil.copytree(
+            ROOT_DIR, app_dir,
+            ignore=shutil.ignore_patterns(
+                "hancer_law.db*", ".session_secret", "__pycache__", "uploads", "prerendered", "profiles"
+            ),
+        )
+        # Mounted as static files at import time
+        (app_dir / "uploads").mkdir()
+        results = [run(app_dir, workers, messages, write_behind) for write_behind in (False, True)]
+        if not all(results):
+            # Keep the logs around for inspection
+            kept = Path(tempfile.mkdtemp(prefix="write-contention-"))
+            for log in app_dir.glob("gunicorn-*.log"):
+                shutil.copy(log, kept)
+            print(f"logs kept in {kept}")
+    return 0 if all(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,107 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import Column, String, DateTime, Boolean, Text, Integer
+from sqlalchemy import Column, String, DateTime, Boolean, Text, Integer, Float, Index, event
 from datetime import datetime, timezone
+import logging
 import uuid
 import os
+import time
 from pathlib import Path
+from search import create_search_tables
+from metrics import record_query
+
+logger = logging.getLogger(__name__)
 
 ROOT_DIR = Path(__file__).parent
-DATABASE_URL = f"sqlite+aiosqlite:///{ROOT_DIR}/hancer_law.db"
+# Directory holding the database with its -wal/-shm files; containers mount
+# it as a volume so all three survive a redeploy
+DATA_DIR = Path(os.environ.get("DATA_DIR", ROOT_DIR))
+DATABASE_URL = f"sqlite+aiosqlite:///{DATA_DIR}/hancer_law.db"
+
+# SQLite profile for several gunicorn workers sharing one file: WAL lets
+# readers proceed while a writer commits, and busy_timeout makes a blocked
+# writer wait for the lock instead of failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "16384"))
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024)))
+SQLITE_READ_POOL_SIZE = int(os.environ.get("SQLITE_READ_POOL_SIZE", "4"))
+
+def _apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    for pragma in pragmas:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+def _common_pragmas():
+    return [
+        f"busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}",
+        f"cache_size = -{SQLITE_CACHE_SIZE_KB}",
+        f"mmap_size = {SQLITE_MMAP_SIZE}",
+        "temp_store = MEMORY",
+    ]
+
+# Writer: one connection per worker, so writes within a worker queue in the
+# pool instead of contending for the file lock. Transactions start with
+# BEGIN IMMEDIATE, which takes the write lock up front (and waits on
+# busy_timeout) rather than failing when a deferred read upgrades to a write.
+engine = create_async_engine(DATABASE_URL, echo=False, pool_size=1, max_overflow=0)
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_writer_connect(dbapi_connection, connection_record):
+    # Let SQLAlchemy, not the driver, emit BEGIN
+    dbapi_connection.isolation_level = None
+    _apply_pragmas(dbapi_connection, [
+        f"journal_mode = {SQLITE_JOURNAL_MODE}",
+        f"synchronous = {SQLITE_SYNCHRONOUS}",
+        *_common_pragmas(),
+    ])
+
+@event.listens_for(engine.sync_engine, "begin")
+def _on_writer_begin(conn):
+    if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+# Readers: a small pool of query_only connections for GET endpoints. In WAL
+# mode they never block on, or block, the writer.
+read_engine = create_async_engine(
+    DATABASE_URL, echo=False, pool_size=SQLITE_READ_POOL_SIZE, max_overflow=0
+)
+
+@event.listens_for(read_engine.sync_engine, "connect")
+def _on_reader_connect(dbapi_connection, connection_record):
+    _apply_pragmas(dbapi_connection, [*_common_pragmas(), "query_only = ON"])
+
+# Query count and timing per request, for /api/metrics
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_query(time.perf_counter() - conn.info["query_started_at"].pop(), statement)
+
+def _on_query_error(exception_context):
+    started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started:
+        started.pop()
+
+for _engine in (engine, read_engine):
+    event.listen(_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine.sync_engine, "handle_error", _on_query_error)
 
-engine = create_async_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, class_=AsyncSession)
 
 Base = declarative_base()
 
+LANGUAGES = ("tr", "en", "de", "ru")
+DEFAULT_LANGUAGE = "tr"
+# Per-language text, stored in translations as (entity id, language, field)
+BLOG_TRANSLATED_FIELDS = ("title", "content")
+SETTINGS_TRANSLATED_FIELDS = ("hero_title", "hero_subtitle", "hero_description", "about_company", "about_founder")
+
 class ContactMessageDB(Base):
     __tablename__ = "contact_messages"
     
@@ -28,23 +115,33 @@ class ContactMessageDB(Base):
     message = Column(Text, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     is_read = Column(Boolean, default=False)
+    
+    __table_args__ = (
+        # Inbox ordering and keyset pagination (get_messages)
+        Index("ix_contact_messages_created_at_id", "created_at", "id"),
+        # Read/unread inbox views
+        Index("ix_contact_messages_is_read_created_at_id", "is_read", "created_at", "id"),
+        # Unread counters grouped by urgency / legal area (covering)
+        Index("ix_contact_messages_is_read_urgency_legal_area", "is_read", "urgency", "legal_area"),
+        Index("ix_contact_messages_is_read_legal_area", "is_read", "legal_area"),
+    )
 
 class BlogPostDB(Base):
     __tablename__ = "blog_posts"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    title_tr = Column(String, nullable=False)
-    title_en = Column(String, nullable=False)
-    title_de = Column(String, nullable=False)
-    title_ru = Column(String, nullable=False)
-    content_tr = Column(Text, nullable=False)
-    content_en = Column(Text, nullable=False)
-    content_de = Column(Text, nullable=False)
-    content_ru = Column(Text, nullable=False)
+    # Title and content live in translations (BLOG_TRANSLATED_FIELDS)
     slug = Column(String, nullable=False, unique=True)
     published = Column(Boolean, default=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        # Published list ordered by (created_at, id), also the keyset cursor
+        Index("ix_blog_posts_published_created_at_id", "published", "created_at", "id"),
+        # Newest update per visibility, for the list ETag
+        Index("ix_blog_posts_published_updated_at", "published", "updated_at"),
+    )
 
 class AdminUserDB(Base):
     __tablename__ = "admin_users"
@@ -54,35 +151,30 @@ class AdminUserDB(Base):
     password_hash = Column(String, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     is_active = Column(Boolean, default=True)
+    # Signed into session tokens; bumped to revoke every token issued before
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
 class SiteSettingsDB(Base):
     __tablename__ = "site_settings"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     logo_url = Column(String, default="")
-    hero_title_tr = Column(String, default="")
-    hero_title_en = Column(String, default="")
-    hero_title_de = Column(String, default="")
-    hero_title_ru = Column(String, default="")
-    hero_subtitle_tr = Column(String, default="")
-    hero_subtitle_en = Column(String, default="")
-    hero_subtitle_de = Column(String, default="")
-    hero_subtitle_ru = Column(String, default="")
-    hero_description_tr = Column(Text, default="")
-    hero_description_en = Column(Text, default="")
-    hero_description_de = Column(Text, default="")
-    hero_description_ru = Column(Text, default="")
-    about_company_tr = Column(Text, default="")
-    about_company_en = Column(Text, default="")
-    about_company_de = Column(Text, default="")
-    about_company_ru = Column(Text, default="")
-    about_founder_tr = Column(Text, default="")
-    about_founder_en = Column(Text, default="")
-    about_founder_de = Column(Text, default="")
-    about_founder_ru = Column(Text, default="")
+    # Hero and about texts live in translations (SETTINGS_TRANSLATED_FIELDS)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
+class TranslationDB(Base):
+    __tablename__ = "translations"
+    
+    # Blog post or site settings id (both are UUIDs)
+    entity_id = Column(String, primary_key=True)
+    lang = Column(String, primary_key=True)
+    field = Column(String, primary_key=True)
+    value = Column(Text, nullable=False, default="")
+    
+    # Clustered on the key, so one language of one entity is a single range read
+    __table_args__ = {"sqlite_with_rowid": False}
+
 class PasswordResetDB(Base):
     __tablename__ = "password_resets"
     
@@ -92,14 +184,175 @@ class PasswordResetDB(Base):
     expires_at = Column(DateTime, nullable=False)
     used = Column(Boolean, default=False)
 
+class CacheVersionDB(Base):
+    __tablename__ = "cache_versions"
+    
+    tag = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class NotificationOutboxDB(Base):
+    __tablename__ = "notification_outbox"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    # Digest rows are delivered together, one message per recipient
+    digest = Column(Boolean, default=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    claimed_until = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at = Column(DateTime)
+    
+    __table_args__ = (
+        # Due-row scan by the notification worker
+        Index("ix_notification_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+class RateLimitBucketDB(Base):
+    __tablename__ = "rate_limit_buckets"
+    
+    # "<rule>|<client address>"
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix time of the last refill
+    updated_at = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_rate_limit_buckets_updated_at", "updated_at"),
+    )
+
+class MessageEventDB(Base):
+    __tablename__ = "message_events"
+    
+    # Monotonic across workers; clients resume from it with Last-Event-ID
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    # "created", "read", "deleted" or "changed" (bulk updates)
+    kind = Column(String, nullable=False)
+    message_id = Column(String)
+    # JSON body of the SSE event
+    data = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        Index("ix_message_events_created_at", "created_at"),
+        # Never reuse a pruned sequence number
+        {"sqlite_autoincrement": True},
+    )
+
+class SchemaMigrationDB(Base):
+    __tablename__ = "schema_migrations"
+    
+    version = Column(Integer, primary_key=True)
+    description = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+# Schema changes for databases created before the models declared them.
+# create_all only adds missing tables, so anything touching an existing table
+# goes here as (version, description, statements), where a statement is SQL
+# or an async callable taking the connection. Statements must be idempotent:
+# fresh databases already have the objects from create_all, and several
+# gunicorn workers may run them at the same time on startup.
+MIGRATIONS = [
+    (1, "Indexes for inbox ordering and the published blog list", [
+        "CREATE INDEX IF NOT EXISTS ix_contact_messages_created_at ON contact_messages (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_blog_posts_published_created_at_id ON blog_posts (published, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_blog_posts_published_updated_at ON blog_posts (published, updated_at)",
+    ]),
+    (2, "Indexes for inbox filters and unread counters", [
+        "CREATE INDEX IF NOT EXISTS ix_contact_messages_is_read_created_at_id "
+        "ON contact_messages (is_read, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_contact_messages_is_read_urgency_legal_area "
+        "ON contact_messages (is_read, urgency, legal_area)",
+    ]),
+    (3, "Move per-language blog and settings text into translations", [
+        lambda conn: _move_to_translations(conn, "blog_posts", BLOG_TRANSLATED_FIELDS),
+        lambda conn: _move_to_translations(conn, "site_settings", SETTINGS_TRANSLATED_FIELDS),
+    ]),
+    (4, "Index the full inbox sort key and unread counts by legal area", [
+        "CREATE INDEX IF NOT EXISTS ix_contact_messages_created_at_id ON contact_messages (created_at, id)",
+        "DROP INDEX IF EXISTS ix_contact_messages_created_at",
+        "CREATE INDEX IF NOT EXISTS ix_contact_messages_is_read_legal_area ON contact_messages (is_read, legal_area)",
+    ]),
+    (5, "Admin session token version", [
+        lambda conn: _add_column(conn, "admin_users", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    ]),
+]
+
+async def _add_column(conn, table: str, column: str, definition: str):
+    """ALTER TABLE ADD COLUMN unless create_all (or another worker) already added it"""
+    columns = {row[1] for row in await conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        await conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+async def _move_to_translations(conn, table: str, fields):
+    """Copy `<field>_<lang>` columns into translations, then drop them (SQLite 3.35+)"""
+    columns = {row[1] for row in await conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+    for field in fields:
+        for lang in LANGUAGES:
+            column = f"{field}_{lang}"
+            if column not in columns:
+                continue
+            await conn.exec_driver_sql(
+                f"INSERT OR IGNORE INTO translations (entity_id, lang, field, value) "
+                f"SELECT id, ?, ?, COALESCE({column}, '') FROM {table}",
+                (lang, field),
+            )
+            await conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+async def apply_migrations(conn):
+    result = await conn.exec_driver_sql("SELECT version FROM schema_migrations")
+    applied = {row[0] for row in result}
+    for version, description, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        for statement in statements:
+            if callable(statement):
+                await statement(conn)
+            else:
+                await conn.exec_driver_sql(statement)
+        await conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO schema_migrations (version, description, applied_at) "
+            "VALUES (?, ?, datetime('now'))",
+            (version, description),
+        )
+        # Refresh planner statistics so the new indexes are picked up
+        await conn.exec_driver_sql("ANALYZE")
+
 # Create tables
 async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await apply_migrations(conn)
+        await create_search_tables(conn)
+
+# Close every connection on shutdown, folding the WAL back into the main file
+async def close_database():
+    await read_engine.dispose()
+    try:
+        async with engine.connect() as conn:
+            # Checkpoints cannot run inside a transaction
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    except Exception as e:
+        logger.warning(f"WAL checkpoint on shutdown failed: {e}")
+    await engine.dispose()
 
 # Dependency to get database session
 async def get_database():
     async with SessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+# Dependency to get a read-only database session (GET endpoints)
+async def get_read_database():
+    async with ReadSessionLocal() as session:
         try:
             yield session
         finally:
@@ -116,11 +116,20 @@ fi
 # 9. Eski container'ı durdur ve sil (varsa)
 if docker ps -a | grep -q hancer-backend; then
     print_info "Eski container durduruluyor ve siliniyor..."
-    docker stop hancer-backend || true
+    # Kapanışta WAL'ın ana dosyaya yazılması için süre tanı
+    docker stop -t 40 hancer-backend || true
     docker rm hancer-backend || true
     print_success "Eski container temizlendi"
 fi
 
+# Veritabanı klasörü: hancer_law.db ve -wal/-shm dosyaları birlikte burada durur
+mkdir -p data
+if [ -f hancer_law.db ] && [ ! -f data/hancer_law.db ]; then
+    print_info "hancer_law.db data/ klasörüne taşınıyor..."
+    mv hancer_law.db* data/
+    print_success "Veritabanı data/ klasörüne taşındı"
+fi
+
 # 10. Docker image build et
 print_info "Docker image build ediliyor... (Bu biraz zaman alabilir)"
 docker build -t hancer-backend .
@@ -133,7 +142,7 @@ docker run -d \
   --restart unless-stopped \
   -p 8000:8000 \
   -v "$(pwd)/uploads:/app/uploads" \
-  -v "$(pwd)/hancer_law.db:/app/hancer_law.db" \
+  -v "$(pwd)/data:/app/data" \
   --env-file .env \
   hancer-backend
 
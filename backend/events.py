@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional, Set
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import MessageEventDB
+from fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+# How often each worker tails message_events while admins are connected
+EVENTS_POLL_SECONDS = float(os.environ.get("EVENTS_POLL_SECONDS", "1"))
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_RETENTION_HOURS = float(os.environ.get("EVENTS_RETENTION_HOURS", "24"))
+# A client further behind than this is told to reload instead of replaying
+EVENTS_REPLAY_LIMIT = int(os.environ.get("EVENTS_REPLAY_LIMIT", "1000"))
+EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", "1000"))
+
+def record_message_event(db: AsyncSession, kind: str, message_id: Optional[str] = None, data: Optional[dict] = None):
+    """Append an inbox event to the change log, inside the caller's transaction"""
+    db.add(MessageEventDB(
+        kind=kind,
+        message_id=message_id,
+        data=dumps(data if data is not None else {"id": message_id}).decode(),
+        created_at=datetime.now(timezone.utc),
+    ))
+
+def format_event(seq: int, kind: str, data: str) -> bytes:
+    return f"id: {seq}\nevent: message.{kind}\ndata: {data}\n\n".encode()
+
+# Tells the client its position is gone (pruned or too far behind): reload the inbox
+RESET_EVENT = b"event: reset\ndata: {}\n\n"
+
+class _Subscriber:
+    __slots__ = ("queue", "overflowed")
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+class MessageEventHub:
+    """Fans the message_events change log out to this worker's SSE clients.
+
+    Writers in any gunicorn worker append to message_events in the same
+    transaction as the change; each worker tails the table by sequence number
+    while it has subscribers and pushes new rows to their queues. A client
+    that reconnects with Last-Event-ID is replayed from the table, so
+    nothing is lost between connections. A client that falls behind its
+    queue is disconnected and catches up the same way.
+    """
+
+    def __init__(self, read_session_factory, write_session_factory):
+        self.read_session_factory = read_session_factory
+        self.write_session_factory = write_session_factory
+        self._subscribers: Set[_Subscriber] = set()
+        self._last_seq: Optional[int] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._next_prune = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # End open streams so shutdown does not wait on them
+        for subscriber in self._subscribers:
+            subscriber.overflowed = True
+            if not subscriber.queue.full():
+                subscriber.queue.put_nowait(None)
+
+    def wake(self):
+        """Poll now; called after a local commit that recorded events"""
+        self._wake.set()
+
+    async def latest_id(self, db: AsyncSession) -> int:
+        return (await db.execute(select(func.max(MessageEventDB.seq)))).scalar() or 0
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                if self._subscribers and self._last_seq is not None:
+                    await self._poll()
+                if time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + 3600
+                    await self._prune()
+            except Exception as e:
+                logger.error(f"Message event tail failed: {e}")
+
+    async def _poll(self):
+        async with self.read_session_factory() as db:
+            result = await db.execute(
+                select(MessageEventDB.seq, MessageEventDB.kind, MessageEventDB.data)
+                .where(MessageEventDB.seq > self._last_seq)
+                .order_by(MessageEventDB.seq)
+                .limit(EVENTS_QUEUE_SIZE)
+            )
+            rows = result.all()
+        for seq, kind, data in rows:
+            event = (seq, format_event(seq, kind, data))
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    subscriber.overflowed = True
+            self._last_seq = seq
+        if len(rows) == EVENTS_QUEUE_SIZE:
+            # More are waiting; fetch them without sleeping
+            self._wake.set()
+
+    async def _prune(self):
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=EVENTS_RETENTION_HOURS)
+        async with self.write_session_factory() as db:
+            await db.execute(delete(MessageEventDB).where(MessageEventDB.created_at < cutoff))
+            await db.commit()
+
+    async def _replay(self, last_event_id: Optional[int]):
+        """Events after `last_event_id` (None: start from now) and the position reached"""
+        async with self.read_session_factory() as db:
+            latest = await self.latest_id(db)
+            if last_event_id is None or last_event_id >= latest:
+                return [], latest, False
+            oldest = (await db.execute(select(func.min(MessageEventDB.seq)))).scalar() or latest
+            if last_event_id < oldest - 1 or latest - last_event_id > EVENTS_REPLAY_LIMIT:
+                return [], latest, True
+            result = await db.execute(
+                select(MessageEventDB.seq, MessageEventDB.kind, MessageEventDB.data)
+                .where(MessageEventDB.seq > last_event_id, MessageEventDB.seq <= latest)
+                .order_by(MessageEventDB.seq)
+            )
+            return [(seq, format_event(seq, kind, data)) for seq, kind, data in result.all()], latest, False
+
+    async def stream(self, last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """SSE body: missed events first, then live ones, with keep-alive comments"""
+        subscriber = _Subscriber()
+        # Registered before the replay, so nothing committed in between is missed
+        self._subscribers.add(subscriber)
+        try:
+            # Reconnect delay for EventSource-style clients
+            yield b"retry: 3000\n\n"
+            backlog, position, reset = await self._replay(last_event_id)
+            if self._last_seq is None:
+                self._last_seq = position
+            if reset:
+                yield f"id: {position}\n".encode() + RESET_EVENT
+            for _, event in backlog:
+                yield event
+            while not subscriber.overflowed or not subscriber.queue.empty():
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                seq, event = item
+                if seq > position:
+                    position = seq
+                    yield event
+        finally:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                # Re-read the position when the next client connects
+                self._last_seq = None
@@ -0,0 +1,86 @@
+import csv
+import io
+import zlib
+from datetime import datetime, timezone
+from enum import Enum
+from typing import AsyncIterator, Iterable, List, Mapping
+from fastapi.responses import StreamingResponse
+from fast_json import dumps
+
+# Rows fetched from the cursor and encoded per chunk
+EXPORT_CHUNK_ROWS = 500
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.CSV: "text/csv; charset=utf-8"}
+
+# Spreadsheet apps evaluate cells starting with these as formulas; messages
+# are written by site visitors
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    value = str(value)
+    if value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def encode_ndjson(rows: Iterable[Mapping]) -> bytes:
+    return b"".join(dumps(dict(row)) + b"\n" for row in rows)
+
+def encode_csv(rows: Iterable[Mapping], columns: List[str], header: bool = False) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    if header:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(row[column]) for column in columns])
+    return out.getvalue().encode()
+
+async def export_chunks(session_factory, query, format: ExportFormat, compress: bool = False) -> AsyncIterator[bytes]:
+    """Encode a query's rows chunk by chunk from a server-side cursor.
+
+    Runs in its own read session, since the response outlives the request's
+    dependencies. Only one chunk of rows (and one of output) is in memory at
+    a time.
+    """
+    columns = [column.name for column in query.selected_columns]
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    if format == ExportFormat.CSV:
+        header = emit(encode_csv([], columns, header=True))
+        if header:
+            yield header
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.mappings().partitions():
+            data = encode_csv(rows, columns) if format == ExportFormat.CSV else encode_ndjson(rows)
+            chunk = emit(data)
+            if chunk:
+                yield chunk
+    if compressor:
+        yield compressor.flush()
+
+def export_response(session_factory, query, format: ExportFormat, name: str, compress: bool = False):
+    """Streamed download named `<name>-<UTC date>.<format>[.gz]`"""
+    filename = f"{name}-{datetime.now(timezone.utc):%Y%m%d}.{format.value}"
+    media_type = MEDIA_TYPES[format]
+    if compress:
+        # A .gz file to keep, not a transfer encoding the client would undo
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        export_chunks(session_factory, query, format, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
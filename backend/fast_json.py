@@ -0,0 +1,42 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Iterable, List, Mapping, Optional
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder produces the same JSON
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Encode plain dicts/lists; naive datetimes come out without an offset, as in FastAPI"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+class FastJSONResponse(Response):
+    """JSON response for content that is already shaped like the response model.
+
+    Returned directly from an endpoint, it skips FastAPI's response_model
+    validation and jsonable_encoder pass; the declared response_model still
+    documents the schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def rows_to_dicts(rows: Iterable[Mapping], extra: Optional[dict] = None) -> List[dict]:
+    """Turn `result.mappings()` rows into dicts, adding constant keys"""
+    if extra:
+        return [{**row, **extra} for row in rows]
+    return [dict(row) for row in rows]
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # uploads are stored unprocessed without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Target widths for responsive variants; images are never upscaled
+VARIANT_WIDTHS = tuple(
+    int(width) for width in os.environ.get("UPLOAD_IMAGE_WIDTHS", "320,640,1280").split(",") if width.strip()
+)
+# Modern formats produced next to the original format ("webp", "avif")
+VARIANT_FORMATS = tuple(
+    fmt.strip().lower() for fmt in os.environ.get("UPLOAD_IMAGE_FORMATS", "webp").split(",") if fmt.strip()
+)
+IMAGE_WORKERS = int(os.environ.get("UPLOAD_IMAGE_WORKERS", "1"))
+
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+PIL_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG", ".webp": "WEBP", ".avif": "AVIF"}
+SAVE_OPTIONS = {
+    "JPEG": {"quality": 82, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 80, "method": 4},
+    "AVIF": {"quality": 60},
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _save(image, path: Path, pil_format: str) -> dict:
+    if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    image.save(path, pil_format, **SAVE_OPTIONS.get(pil_format, {}))
+    return {"path": path, "width": image.width, "height": image.height, "size": path.stat().st_size}
+
+def build_variants(source_path: str, output_dir: str, widths: List[int] = VARIANT_WIDTHS,
+                   formats: List[str] = VARIANT_FORMATS) -> dict:
+    """Write resized copies of an image in its own format and each of `formats`.
+
+    Runs in a worker process; only plain picklable values cross the boundary.
+    """
+    source = Path(source_path)
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    original_format = PIL_FORMATS[source.suffix.lower()]
+    extra_formats = [
+        fmt for fmt in formats
+        if f".{fmt}" in PIL_FORMATS and PIL_FORMATS[f".{fmt}"] != original_format and features.check(fmt)
+    ]
+
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    width, height = image.size
+
+    targets = sorted({w for w in widths if w < width})
+    variants = []
+    for target in targets + [width]:
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS
+        )
+        # The full-size original already exists; only add modern formats for it
+        pending = [(source.suffix.lower(), original_format)] if target != width else []
+        pending += [(f".{fmt}", PIL_FORMATS[f".{fmt}"]) for fmt in extra_formats]
+        for suffix, pil_format in pending:
+            path = output / f"{source.stem}-{target}w{suffix}"
+            saved = _save(resized, path, pil_format)
+            variants.append({
+                "filename": path.name,
+                "format": pil_format.lower(),
+                "width": saved["width"],
+                "height": saved["height"],
+                "size": saved["size"],
+            })
+    return {"width": width, "height": height, "format": original_format.lower(), "variants": variants}
+
+def read_dimensions(path: Path):
+    """Width and height from the image header, or (None, None) if unknown"""
+    if Image is None or path.suffix.lower() not in RASTER_EXTENSIONS:
+        return None, None
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _pool
+
+async def process_upload(source_path: Path, output_dir: Path, url_prefix: str) -> Optional[dict]:
+    """Build responsive variants off the event loop and describe them for `srcset`.
+
+    Returns None for non-raster files (SVG) or when Pillow is unavailable.
+    """
+    if Image is None or source_path.suffix.lower() not in RASTER_EXTENSIONS:
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        manifest = await loop.run_in_executor(_get_pool(), build_variants, str(source_path), str(output_dir))
+    except Exception as e:
+        logger.warning(f"Image processing failed for {source_path.name}: {e}")
+        return None
+
+    original = {
+        "url": f"{url_prefix}/{source_path.name}",
+        "format": manifest["format"],
+        "width": manifest["width"],
+        "height": manifest["height"],
+        "size": source_path.stat().st_size,
+    }
+    variants = [original] + [
+        {"url": f"{url_prefix}/{output_dir.name}/{variant.pop('filename')}", **variant}
+        for variant in manifest["variants"]
+    ]
+    srcset = {}
+    for variant in variants:
+        srcset.setdefault(variant["format"], []).append(f"{variant['url']} {variant['width']}w")
+    return {
+        "width": manifest["width"],
+        "height": manifest["height"],
+        "variants": variants,
+        "srcset": {fmt: ", ".join(entries) for fmt, entries in srcset.items()},
+    }
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
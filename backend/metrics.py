@@ -0,0 +1,283 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = Path(os.environ.get("METRICS_DIR", Path(__file__).parent / "metrics"))
+# How often each worker publishes its counters for the others to aggregate
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+# Snapshots not rewritten for this long belong to a worker that is gone, even
+# if its pid has been reused since
+METRICS_SNAPSHOT_TTL_SECONDS = float(os.environ.get("METRICS_SNAPSHOT_TTL_SECONDS", "300"))
+METRICS_SLOW_QUERY_MS = float(os.environ.get("METRICS_SLOW_QUERY_MS", "200"))
+# Log requests issuing more queries than this (N+1 patterns)
+METRICS_QUERY_WARN = int(os.environ.get("METRICS_QUERY_WARN", "50"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+QUERY_LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+
+# name -> (type, help, label names, buckets)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP responses by route and status", ("method", "route", "status"), None),
+    "http_request_duration_seconds": (
+        "histogram", "Time to produce the full response", ("method", "route"), LATENCY_BUCKETS
+    ),
+    "http_response_size_bytes": ("histogram", "Response body size", ("method", "route"), SIZE_BUCKETS),
+    "http_requests_in_progress": ("gauge", "Requests currently being handled", (), None),
+    "db_queries_per_request": ("histogram", "SQL statements issued per request", ("route",), QUERY_COUNT_BUCKETS),
+    "db_query_duration_seconds": ("histogram", "SQL statement execution time", ("route",), QUERY_LATENCY_BUCKETS),
+    "db_slow_queries_total": ("counter", f"SQL statements slower than {METRICS_SLOW_QUERY_MS:g} ms", ("route",), None),
+    "response_cache_requests_total": (
+        "counter", "Cacheable GET requests by outcome (hit, miss, coalesced)", ("route", "result"), None
+    ),
+    "response_cache_evictions_total": ("counter", "Response cache entries evicted to stay in bounds", (), None),
+    "response_cache_entries": ("gauge", "Response cache entries held", (), None),
+    "response_cache_bytes": ("gauge", "Response cache body and header bytes held", (), None),
+}
+
+class RequestStats:
+    __slots__ = ("scope", "queries", "query_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.query_seconds = 0.0
+
+_current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "metrics_request", default=None
+)
+
+class MetricsRegistry:
+    """This worker's metric values, keyed by metric name and label values"""
+
+    def __init__(self):
+        self.values: Dict[str, Dict[Tuple[str, ...], object]] = {name: {} for name in METRICS}
+
+    def inc(self, name: str, labels: Tuple[str, ...] = (), amount: float = 1):
+        series = self.values[name]
+        series[labels] = series.get(labels, 0) + amount
+
+    def set(self, name: str, value: float, labels: Tuple[str, ...] = ()):
+        self.values[name][labels] = value
+
+    def observe(self, name: str, value: float, labels: Tuple[str, ...] = ()):
+        buckets = METRICS[name][3]
+        series = self.values[name]
+        histogram = series.get(labels)
+        if histogram is None:
+            # Per-bucket (non-cumulative) counts, then +Inf, sum and count
+            histogram = series[labels] = [0] * (len(buckets) + 1) + [0.0, 0]
+        histogram[bisect_left(buckets, value)] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            name: [[list(labels), value] for labels, value in series.items()]
+            for name, series in self.values.items()
+        }
+
+registry = MetricsRegistry()
+
+def record_query(duration: float, statement: str):
+    """Called from the engine event hooks in database.py"""
+    stats = _current_request.get()
+    # The router stores the matched route in the shared scope before the endpoint runs
+    route = route_label(stats.scope) if stats else "background"
+    if stats:
+        stats.queries += 1
+        stats.query_seconds += duration
+    registry.observe("db_query_duration_seconds", duration, (route,))
+    if duration * 1000 >= METRICS_SLOW_QUERY_MS:
+        registry.inc("db_slow_queries_total", (route,))
+        logger.warning(f"Slow query ({duration * 1000:.0f} ms, {route}): {' '.join(statement.split())[:500]}")
+
+class MetricsMiddleware:
+    """Time every HTTP request and count its status, response size and SQL statements"""
+
+    def __init__(self, app):
+        self.app = app
+        self.in_progress = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.in_progress += 1
+        registry.set("http_requests_in_progress", self.in_progress)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_progress -= 1
+            registry.set("http_requests_in_progress", self.in_progress)
+            _current_request.reset(token)
+            route = route_label(scope)
+            method = scope["method"]
+            registry.inc("http_requests_total", (method, route, str(status)))
+            registry.observe("http_request_duration_seconds", time.perf_counter() - started, (method, route))
+            registry.observe("http_response_size_bytes", size, (method, route))
+            registry.observe("db_queries_per_request", stats.queries, (route,))
+            if stats.queries > METRICS_QUERY_WARN:
+                logger.warning(f"{method} {route} issued {stats.queries} queries")
+
+def route_label(scope) -> str:
+    # The route template, not the raw path, keeps label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+# Cross-worker aggregation: each worker writes its snapshot to its own file
+
+def pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # Windows runs a single process, and os.kill would terminate the target
+        return pid == os.getpid()
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class MetricsStore:
+    """Per-worker snapshot files, merged when /api/metrics is scraped.
+
+    Snapshots of exited workers (dead pid, or not rewritten within the TTL)
+    are deleted at the next scrape, so totals only cover running workers.
+    Prometheus reads the resulting drop in a counter as a reset.
+    """
+
+    def __init__(self, directory: Path = METRICS_DIR, flush_interval: float = METRICS_FLUSH_SECONDS):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.path: Optional[Path] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _serialize(self) -> str:
+        # Taken on the event loop thread, where the registry is updated
+        return json.dumps({"pid": os.getpid(), "metrics": registry.snapshot()})
+
+    def _write(self, data: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(data)
+        os.replace(tmp_path, self.path)
+
+    def flush(self):
+        if self.path is not None:
+            self._write(self._serialize())
+
+    def start(self):
+        # Named after the worker process, so only resolved once it is running
+        self.path = self.directory / f"worker-{os.getpid()}-{int(time.time())}.json"
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self._write, self._serialize())
+            except OSError as e:
+                logger.warning(f"Could not write metrics snapshot: {e}")
+
+    async def collect(self) -> Dict[str, Dict[Tuple[str, ...], object]]:
+        """Merge every worker's latest snapshot, with this worker's up to date"""
+        data = self._serialize()
+        if self.path is None:
+            return _merge([json.loads(data)])
+        await asyncio.to_thread(self._write, data)
+        return _merge(await asyncio.to_thread(self._read_all))
+
+    def _read_all(self) -> List[dict]:
+        snapshots = []
+        now = time.time()
+        for path in self.directory.glob("worker-*.json"):
+            try:
+                if path != self.path and now - path.stat().st_mtime > METRICS_SNAPSHOT_TTL_SECONDS:
+                    path.unlink(missing_ok=True)
+                    continue
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if not pid_alive(snapshot["pid"]):
+                path.unlink(missing_ok=True)
+                continue
+            snapshots.append(snapshot)
+        return snapshots
+
+def _merge(snapshots: List[dict]) -> Dict[str, Dict[Tuple[str, ...], object]]:
+    merged: Dict[str, Dict[Tuple[str, ...], object]] = {name: {} for name in METRICS}
+    for snapshot in snapshots:
+        for name, series in snapshot["metrics"].items():
+            if name not in METRICS:
+                continue
+            for labels, value in series:
+                labels = tuple(labels)
+                current = merged[name].get(labels)
+                if current is None:
+                    merged[name][labels] = value
+                elif isinstance(value, list):
+                    merged[name][labels] = [a + b for a, b in zip(current, value)]
+                else:
+                    merged[name][labels] = current + value
+    return merged
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def render_prometheus(merged: Dict[str, Dict[Tuple[str, ...], object]]) -> str:
+    """Prometheus text exposition format 0.0.4"""
+    lines: List[str] = []
+    for name, (kind, help_text, label_names, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(merged[name].items()):
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(label_names, labels)} {value:g}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], value):
+                cumulative += count
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                le_label = f'le="{le}"'
+                lines.append(f"{name}_bucket{_labels(label_names, labels, le_label)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(label_names, labels)} {value[-2]:g}")
+            lines.append(f"{name}_count{_labels(label_names, labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
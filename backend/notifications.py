@@ -0,0 +1,310 @@
+import asyncio
+import json
+import logging
+import os
+import smtplib
+import ssl
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import NotificationOutboxDB
+
+logger = logging.getLogger(__name__)
+
+# "smtp", "webhook" or "file"; empty disables notifications entirely
+NOTIFY_TRANSPORT = os.environ.get("NOTIFY_TRANSPORT", "").lower()
+NOTIFY_EMAIL_TO = os.environ.get("NOTIFY_EMAIL_TO", "")
+NOTIFY_EMAIL_FROM = os.environ.get("NOTIFY_EMAIL_FROM", "noreply@localhost")
+NOTIFY_WEBHOOK_URL = os.environ.get("NOTIFY_WEBHOOK_URL", "")
+NOTIFY_FILE_PATH = os.environ.get("NOTIFY_FILE_PATH", str(Path(__file__).parent / "notifications.jsonl"))
+# SMTP settings; a local debug server (python -m aiosmtpd -n -l localhost:1025) works too
+SMTP_HOST = os.environ.get("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "25"))
+SMTP_USERNAME = os.environ.get("SMTP_USERNAME", "")
+SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "false").lower() in ("1", "true", "yes")
+
+# Low-priority inquiries are collected and sent at most once per window
+NOTIFY_DIGEST_MINUTES = float(os.environ.get("NOTIFY_DIGEST_MINUTES", "15"))
+NOTIFY_POLL_SECONDS = float(os.environ.get("NOTIFY_POLL_SECONDS", "5"))
+NOTIFY_MAX_ATTEMPTS = int(os.environ.get("NOTIFY_MAX_ATTEMPTS", "8"))
+NOTIFY_RETRY_BASE_SECONDS = float(os.environ.get("NOTIFY_RETRY_BASE_SECONDS", "30"))
+NOTIFY_RETRY_MAX_SECONDS = float(os.environ.get("NOTIFY_RETRY_MAX_SECONDS", "3600"))
+NOTIFY_RETENTION_DAYS = int(os.environ.get("NOTIFY_RETENTION_DAYS", "30"))
+# How long a claimed row is hidden from other workers while it is being sent
+CLAIM_LEASE_SECONDS = 300
+BATCH_SIZE = 50
+
+DIGEST_URGENCIES = ("low", "medium")
+
+# Transports: blocking send(message) with keys to/subject/body/kind, run in a thread
+
+class SMTPTransport:
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, username: str = SMTP_USERNAME,
+                 password: str = SMTP_PASSWORD, starttls: bool = SMTP_STARTTLS, sender: str = NOTIFY_EMAIL_FROM):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.sender = sender
+
+    def send(self, message: dict):
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message["to"]
+        email["Subject"] = message["subject"]
+        email.set_content(message["body"])
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(email)
+
+class WebhookTransport:
+    def __init__(self, url: str = NOTIFY_WEBHOOK_URL):
+        self.url = url
+
+    def send(self, message: dict):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(message).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+
+class FileTransport:
+    """Append each message as a JSON line; for local development and tests"""
+
+    def __init__(self, path: str = NOTIFY_FILE_PATH):
+        self.path = Path(path)
+
+    def send(self, message: dict):
+        with open(self.path, "a", encoding="utf-8") as sink:
+            sink.write(json.dumps(message, ensure_ascii=False) + "\n")
+
+TRANSPORTS = {"smtp": SMTPTransport, "webhook": WebhookTransport, "file": FileTransport}
+
+def transport_from_env():
+    if not NOTIFY_TRANSPORT:
+        return None
+    if NOTIFY_TRANSPORT not in TRANSPORTS:
+        logger.warning(f"Unknown NOTIFY_TRANSPORT {NOTIFY_TRANSPORT!r}, notifications disabled")
+        return None
+    if NOTIFY_TRANSPORT == "smtp" and not NOTIFY_EMAIL_TO:
+        raise RuntimeError("NOTIFY_TRANSPORT=smtp needs NOTIFY_EMAIL_TO, the address inquiries are sent to")
+    return TRANSPORTS[NOTIFY_TRANSPORT]()
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def enqueue_notification(db: AsyncSession, kind: str, recipient: str, subject: str, body: str,
+                         digest: bool = False):
+    """Add a notification to the outbox as part of the caller's transaction"""
+    now = _utcnow()
+    db.add(NotificationOutboxDB(
+        kind=kind,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        digest=digest,
+        status="pending",
+        attempts=0,
+        next_attempt_at=now + timedelta(minutes=NOTIFY_DIGEST_MINUTES) if digest else now,
+        created_at=now,
+    ))
+
+def enqueue_message_notification(db: AsyncSession, message: dict):
+    """Notify the office about a new inquiry; low and medium urgency go to the digest"""
+    body = (
+        f"From: {message['name']} <{message['email']}>\n"
+        f"Phone: {message['phone']}\n"
+        f"Legal area: {message['legal_area']}\n"
+        f"Urgency: {message['urgency']}\n"
+        f"Subject: {message['subject']}\n\n"
+        f"{message['message']}"
+    )
+    enqueue_notification(
+        db,
+        "new_message",
+        NOTIFY_EMAIL_TO,
+        f"[{message['urgency']}] New inquiry: {message['subject']}",
+        body,
+        digest=message["urgency"] in DIGEST_URGENCIES,
+    )
+
+def build_digest(rows: List[NotificationOutboxDB]) -> dict:
+    separator = "\n\n" + "-" * 40 + "\n\n"
+    return {
+        "to": rows[0].recipient,
+        "subject": f"{len(rows)} new inquiries",
+        "body": separator.join(f"{row.subject}\n\n{row.body}" for row in rows),
+        "kind": "digest",
+    }
+
+class NotificationWorker:
+    """Deliver outbox rows in the background with retries and exponential backoff.
+
+    Every gunicorn worker runs one; rows are claimed with a lease inside a
+    write transaction, so each is picked up by only one of them. `wake()`
+    skips the poll delay after this worker enqueues something urgent.
+    """
+
+    def __init__(self, transport, session_factory, poll_interval: float = NOTIFY_POLL_SECONDS):
+        self.transport = transport
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._pruned_at: Optional[datetime] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.transport is not None
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Notification worker started ({type(self.transport).__name__})")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def wake(self):
+        self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while await self.process_due():
+                    pass
+                await self._prune()
+            except Exception as e:
+                logger.error(f"Notification worker error: {e}")
+
+    async def process_due(self) -> int:
+        """Send everything that is due; returns the number of rows handled"""
+        rows = await self._claim()
+        if not rows:
+            return 0
+        deliveries = [([row], self._as_message(row)) for row in rows if not row.digest]
+        digests: Dict[str, List[NotificationOutboxDB]] = {}
+        for row in rows:
+            if row.digest:
+                digests.setdefault(row.recipient, []).append(row)
+        deliveries += [(group, build_digest(group)) for group in digests.values()]
+
+        for group, message in deliveries:
+            try:
+                await asyncio.to_thread(self.transport.send, message)
+            except Exception as e:
+                logger.warning(f"Notification delivery failed ({message['kind']}): {e}")
+                await self._record_failure(group, str(e))
+            else:
+                await self._record_success(group)
+        return len(rows)
+
+    def _as_message(self, row: NotificationOutboxDB) -> dict:
+        return {"to": row.recipient, "subject": row.subject, "body": row.body, "kind": row.kind}
+
+    async def _claim(self) -> List[NotificationOutboxDB]:
+        now = _utcnow()
+        claimable = (
+            (NotificationOutboxDB.status == "pending")
+            & or_(NotificationOutboxDB.claimed_until.is_(None), NotificationOutboxDB.claimed_until < now)
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(NotificationOutboxDB)
+                .where(claimable, NotificationOutboxDB.next_attempt_at <= now)
+                .order_by(NotificationOutboxDB.next_attempt_at)
+                .limit(BATCH_SIZE)
+            )
+            rows = list(result.scalars())
+            # Once any digest row is due, the rest of the pending digest goes
+            # with it; rows backing off after a failed send wait for their turn
+            if any(row.digest for row in rows):
+                claimed_ids = {row.id for row in rows}
+                result = await db.execute(
+                    select(NotificationOutboxDB)
+                    .where(
+                        claimable,
+                        NotificationOutboxDB.digest == True,
+                        or_(NotificationOutboxDB.attempts == 0, NotificationOutboxDB.next_attempt_at <= now),
+                    )
+                    .order_by(NotificationOutboxDB.id)
+                )
+                rows += [row for row in result.scalars() if row.id not in claimed_ids]
+            if rows:
+                await db.execute(
+                    update(NotificationOutboxDB)
+                    .where(NotificationOutboxDB.id.in_([row.id for row in rows]))
+                    .values(claimed_until=now + timedelta(seconds=CLAIM_LEASE_SECONDS))
+                )
+            # Keep the loaded rows usable after the session closes
+            db.expunge_all()
+            await db.commit()
+        return rows
+
+    async def _record_success(self, rows: List[NotificationOutboxDB]):
+        async with self.session_factory() as db:
+            await db.execute(
+                update(NotificationOutboxDB)
+                .where(NotificationOutboxDB.id.in_([row.id for row in rows]))
+                .values(
+                    status="sent",
+                    sent_at=_utcnow(),
+                    claimed_until=None,
+                    attempts=NotificationOutboxDB.attempts + 1,
+                )
+            )
+            await db.commit()
+
+    async def _record_failure(self, rows: List[NotificationOutboxDB], error: str):
+        now = _utcnow()
+        async with self.session_factory() as db:
+            for row in rows:
+                attempts = row.attempts + 1
+                delay = min(NOTIFY_RETRY_BASE_SECONDS * 2 ** (attempts - 1), NOTIFY_RETRY_MAX_SECONDS)
+                await db.execute(
+                    update(NotificationOutboxDB)
+                    .where(NotificationOutboxDB.id == row.id)
+                    .values(
+                        status="failed" if attempts >= NOTIFY_MAX_ATTEMPTS else "pending",
+                        attempts=attempts,
+                        next_attempt_at=now + timedelta(seconds=delay),
+                        claimed_until=None,
+                        last_error=error[:1000],
+                    )
+                )
+            await db.commit()
+
+    async def _prune(self):
+        """Drop delivered rows past the retention window, at most once an hour"""
+        now = _utcnow()
+        if self._pruned_at is not None and now - self._pruned_at < timedelta(hours=1):
+            return
+        self._pruned_at = now
+        async with self.session_factory() as db:
+            await db.execute(
+                delete(NotificationOutboxDB).where(
+                    NotificationOutboxDB.status == "sent",
+                    NotificationOutboxDB.sent_at < now - timedelta(days=NOTIFY_RETENTION_DAYS),
+                )
+            )
+            await db.commit()
@@ -0,0 +1,374 @@
+import asyncio
+import gzip
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+from fastapi import Request, Response
+from sqlalchemy import select
+from database import BlogPostDB, BLOG_TRANSLATED_FIELDS
+from translations import with_translations
+from http_cache import accepts_encoding, make_etag, is_not_modified
+
+logger = logging.getLogger(__name__)
+
+PRERENDER_LANGUAGES = ("tr", "en", "de", "ru")
+DEFAULT_LANGUAGE = "tr"
+# Blog excerpt length in the landing page payload (the list only shows a preview)
+EXCERPT_LENGTH = 300
+
+SECTION_TITLES = {
+    "about": {"tr": "Hakkımızda", "en": "About Us", "de": "Über uns", "ru": "О нас"},
+    "blog": {"tr": "Blog", "en": "Blog", "de": "Blog", "ru": "Блог"},
+}
+
+# Slugs that are safe to use as file names; anything else falls back to the SPA
+SAFE_SLUG = re.compile(r"[\w-]{1,200}")
+
+def _posts_query(*group_by):
+    # Every language is rendered, so read all of them
+    return with_translations(select(*BlogPostDB.__table__.c), BlogPostDB.id, BLOG_TRANSLATED_FIELDS, group_by)
+
+def _localized(row, field: str, lang: str) -> str:
+    return getattr(row, f"{field}_{lang}") or getattr(row, f"{field}_{DEFAULT_LANGUAGE}") or ""
+
+def _paragraphs(text: str) -> str:
+    return "".join(f"<p>{html.escape(part)}</p>" for part in text.split("\n\n") if part.strip())
+
+def _script_json(data) -> str:
+    # Keep "</script>" and line separators from ending the inline script early
+    return (
+        json.dumps(data, ensure_ascii=False, default=str)
+        .replace("<", "\\u003c").replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+    )
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+def _read_snapshot(path: Path) -> Optional[Tuple[bytes, os.stat_result]]:
+    try:
+        with open(path, "rb") as snapshot:
+            return snapshot.read(), os.fstat(snapshot.fileno())
+    except FileNotFoundError:
+        return None
+
+class Prerenderer:
+    """Static HTML snapshots of the landing page and published posts, per language.
+
+    Each snapshot is the SPA's index.html with the page's text rendered into
+    #root (shown before the bundle loads) and the API data it would fetch
+    inlined as `window.__PRERENDERED__`. Files live at `<lang>/index.html`
+    and `<lang>/blog/<slug>.html` with a .gz sibling; each is written through
+    a temp file and rename, and only when its content changed. The slug each
+    post was last rendered under is kept in `.post-slugs/`, shared by all
+    workers, so a renamed or unpublished post's old files can be removed
+    without scanning the directory.
+    """
+
+    def __init__(self, template_path: Path, output_dir: Path, session_factory, load_settings):
+        self.template_path = template_path
+        self.output_dir = output_dir
+        self.session_factory = session_factory
+        self.load_settings = load_settings
+        self._template: Optional[str] = None
+        self._template_mtime_ns: Optional[int] = None
+        self._pending_posts: Set[str] = set()
+        self._pending_landing = False
+        self._pending_full = False
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # Scheduling: callers mark what changed after their commit; one task per
+    # worker renders it in the background, coalescing bursts of edits
+
+    def start(self):
+        self._pending_full = True
+        self._wake.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def posts_changed(self, *post_ids: str):
+        """Posts were created, edited, (un)published or deleted; the landing page lists them"""
+        self._pending_posts.update(post_ids)
+        self._pending_landing = True
+        self._wake.set()
+
+    def landing_changed(self):
+        self._pending_landing = True
+        self._wake.set()
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            full, self._pending_full = self._pending_full, False
+            landing, self._pending_landing = self._pending_landing, False
+            post_ids, self._pending_posts = self._pending_posts, set()
+            try:
+                if full:
+                    await self.rebuild_all()
+                else:
+                    if post_ids:
+                        await self.rebuild_posts(post_ids)
+                    if landing:
+                        await self.rebuild_landing()
+            except Exception as e:
+                logger.error(f"Pre-rendering failed: {e}")
+
+    # Rendering
+
+    def _load_template(self) -> Optional[str]:
+        try:
+            mtime_ns = self.template_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime_ns != self._template_mtime_ns:
+            self._template = self.template_path.read_text(encoding="utf-8")
+            self._template_mtime_ns = mtime_ns
+        return self._template
+
+    def _render(self, template: str, lang: str, title: Optional[str], body: str, payload: dict) -> bytes:
+        # Replacements are functions so backslashes in titles are not read as escapes
+        page = re.sub(r"<html[^>]*>", lambda _: f'<html lang="{lang}">', template, count=1)
+        if title:
+            page = re.sub(
+                r"<title>.*?</title>", lambda _: f"<title>{html.escape(title)}</title>", page, count=1, flags=re.S
+            )
+        page = page.replace("</head>", f"<script>window.__PRERENDERED__={_script_json(payload)}</script></head>", 1)
+        page = page.replace('<div id="root"></div>', f'<div id="root">{body}</div>', 1)
+        return page.encode("utf-8")
+
+    def _store(self, path: Path, data: bytes) -> bool:
+        """Write a snapshot and its .gz sibling unless the file already has this content"""
+        try:
+            if path.read_bytes() == data:
+                return False
+        except FileNotFoundError:
+            pass
+        _write_atomic(path.with_name(path.name + ".gz"), gzip.compress(data, 9, mtime=0))
+        _write_atomic(path, data)
+        return True
+
+    def _remove(self, path: Path):
+        for stale in (path, path.with_name(path.name + ".gz")):
+            stale.unlink(missing_ok=True)
+
+    def post_path(self, lang: str, slug: str) -> Path:
+        return self.output_dir / lang / "blog" / f"{slug}.html"
+
+    def landing_path(self, lang: str) -> Path:
+        return self.output_dir / lang / "index.html"
+
+    def slug_index_path(self, post_id: str) -> Path:
+        # Hashed: post ids are not guaranteed to be safe file names
+        return self.output_dir / ".post-slugs" / hashlib.sha1(post_id.encode()).hexdigest()
+
+    async def rebuild_landing(self):
+        template = self._load_template()
+        if template is None:
+            return
+        async with self.session_factory() as db:
+            settings = (await self.load_settings(db)).model_dump(mode="json")
+            result = await db.execute(
+                _posts_query(BlogPostDB.created_at, BlogPostDB.id)
+                .where(BlogPostDB.published == True)
+                .order_by(BlogPostDB.created_at.desc(), BlogPostDB.id.desc())
+            )
+            posts = result.all()
+        pages = {lang: self._render_landing(template, lang, settings, posts) for lang in PRERENDER_LANGUAGES}
+        written = await asyncio.to_thread(
+            lambda: sum(self._store(self.landing_path(lang), page) for lang, page in pages.items())
+        )
+        if written:
+            logger.info(f"Pre-rendered {written} landing page(s)")
+
+    def _render_landing(self, template: str, lang: str, settings: dict, posts) -> bytes:
+        def setting(field: str) -> str:
+            return settings.get(f"{field}_{lang}") or settings.get(f"{field}_{DEFAULT_LANGUAGE}") or ""
+
+        blog = []
+        items = []
+        for post in posts:
+            title = _localized(post, "title", lang)
+            content = _localized(post, "content", lang)
+            blog.append({
+                "id": post.id,
+                "slug": post.slug,
+                "lang": lang,
+                "title": title,
+                "content": content[:EXCERPT_LENGTH],
+                "published": post.published,
+                "created_at": post.created_at.isoformat(),
+                "updated_at": post.updated_at.isoformat(),
+            })
+            items.append(
+                f'<li><a href="/blog/{html.escape(post.slug)}">{html.escape(title)}</a></li>'
+            )
+        body = (
+            f"<main><section id=\"home\"><h1>{html.escape(setting('hero_title'))}</h1>"
+            f"<p>{html.escape(setting('hero_subtitle'))}</p>{_paragraphs(setting('hero_description'))}</section>"
+            f"<section id=\"about\"><h2>{SECTION_TITLES['about'][lang]}</h2>"
+            f"{_paragraphs(setting('about_company'))}{_paragraphs(setting('about_founder'))}</section>"
+            f"<section id=\"blog\"><h2>{SECTION_TITLES['blog'][lang]}</h2><ul>{''.join(items)}</ul></section></main>"
+        )
+        return self._render(template, lang, None, body, {"lang": lang, "settings": settings, "blog": blog})
+
+    async def rebuild_posts(self, post_ids: Iterable[str]):
+        template = self._load_template()
+        if template is None:
+            return
+        post_ids = list(post_ids)
+        async with self.session_factory() as db:
+            result = await db.execute(_posts_query().where(BlogPostDB.id.in_(post_ids)))
+            posts = {post.id: post for post in result.all()}
+        live = {
+            post.slug: (post_id, {lang: self._render_post(template, lang, post) for lang in PRERENDER_LANGUAGES})
+            for post_id, post in posts.items()
+            if post.published and SAFE_SLUG.fullmatch(post.slug)
+        }
+        await asyncio.to_thread(self._sync_posts, set(post_ids), live)
+
+    def _sync_posts(self, post_ids: Set[str], live: Dict[str, Tuple[str, Dict[str, bytes]]]):
+        live_slugs = {post_id: slug for slug, (post_id, _) in live.items()}
+        old_slugs = {}
+        # Snapshots under the slug a post was last rendered with, if it was
+        # renamed, unpublished or deleted since. Removed before writing, as
+        # another post in this batch may have taken the old slug; the owner
+        # check keeps a later post that already did so.
+        for post_id in post_ids:
+            index_path = self.slug_index_path(post_id)
+            try:
+                old_slug = index_path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            old_slugs[post_id] = old_slug
+            if old_slug != live_slugs.get(post_id):
+                for lang in PRERENDER_LANGUAGES:
+                    path = self.post_path(lang, old_slug)
+                    if self._snapshot_owner(path) == post_id:
+                        self._remove(path)
+            if post_id not in live_slugs:
+                index_path.unlink(missing_ok=True)
+        written = 0
+        for slug, (post_id, pages) in live.items():
+            for lang, page in pages.items():
+                written += self._store(self.post_path(lang, slug), page)
+            if old_slugs.get(post_id) != slug:
+                _write_atomic(self.slug_index_path(post_id), slug.encode("utf-8"))
+        if written:
+            logger.info(f"Pre-rendered {written} blog page(s)")
+
+    def _snapshot_owner(self, path: Path) -> Optional[str]:
+        try:
+            with open(path, "rb") as snapshot:
+                head = snapshot.read(4096)
+        except OSError:
+            return None
+        match = re.search(rb'<meta name="x-post-id" content="([^"]+)"', head)
+        return match.group(1).decode() if match else None
+
+    def _render_post(self, template: str, lang: str, post) -> bytes:
+        title = _localized(post, "title", lang)
+        content = _localized(post, "content", lang)
+        payload = {
+            "lang": lang,
+            "post": {
+                "id": post.id,
+                "slug": post.slug,
+                "lang": lang,
+                "title": title,
+                "content": content,
+                "published": post.published,
+                "created_at": post.created_at.isoformat(),
+                "updated_at": post.updated_at.isoformat(),
+            },
+        }
+        body = f"<main><article><h1>{html.escape(title)}</h1>{_paragraphs(content)}</article></main>"
+        page = self._render(template, lang, title, body, payload)
+        # Lets a later rebuild find this file if the post's slug changes
+        return page.replace(b"<head>", f'<head><meta name="x-post-id" content="{html.escape(post.id)}">'.encode(), 1)
+
+    async def rebuild_all(self):
+        """Render every page and drop snapshots that match no published post
+
+        The one full scan of the snapshot directories, run at startup; it also
+        catches files the slug index does not know about.
+        """
+        if self._load_template() is None:
+            logger.info(f"No frontend template at {self.template_path}, pre-rendering skipped")
+            return
+        async with self.session_factory() as db:
+            result = await db.execute(select(BlogPostDB.id, BlogPostDB.slug, BlogPostDB.published))
+            posts = result.all()
+        post_ids = {post.id for post in posts}
+        published_slugs = {post.id: post.slug for post in posts if post.published}
+        stale = set()
+        for lang in PRERENDER_LANGUAGES:
+            directory = self.output_dir / lang / "blog"
+            if directory.is_dir():
+                for path in directory.glob("*.html"):
+                    owner = self._snapshot_owner(path)
+                    if published_slugs.get(owner) != path.stem:
+                        stale.add(path)
+        for path in stale:
+            self._remove(path)
+        index_dir = self.output_dir / ".post-slugs"
+        if index_dir.is_dir():
+            live_entries = {self.slug_index_path(post_id).name for post_id in post_ids}
+            for path in index_dir.iterdir():
+                # Dot files are another worker's writes in progress
+                if not path.name.startswith(".") and path.name not in live_entries:
+                    path.unlink(missing_ok=True)
+        await self.rebuild_posts(post_ids)
+        await self.rebuild_landing()
+
+    # Serving
+
+    def pick_language(self, request: Request) -> str:
+        """?lang=, then the SPA's preferred-language cookie, then Accept-Language"""
+        for candidate in (request.query_params.get("lang"), request.cookies.get("preferred-language")):
+            if candidate in PRERENDER_LANGUAGES:
+                return candidate
+        for part in request.headers.get("accept-language", "").split(","):
+            primary = part.split(";")[0].strip()[:2].lower()
+            if primary in PRERENDER_LANGUAGES:
+                return primary
+        return DEFAULT_LANGUAGE
+
+    async def response(self, request: Request, full_path: str) -> Optional[Response]:
+        """Snapshot for `/` or `/blog/<slug>`, or None to fall back to the SPA shell"""
+        lang = self.pick_language(request)
+        if full_path == "":
+            path = self.landing_path(lang)
+        elif full_path.startswith("blog/") and SAFE_SLUG.fullmatch(full_path[5:]):
+            path = self.post_path(lang, full_path[5:])
+        else:
+            return None
+        use_gzip = accepts_encoding(request.headers.get("accept-encoding", ""), "gzip")
+        if use_gzip:
+            path = path.with_name(path.name + ".gz")
+        # Snapshots are rewritten by whichever worker handled the edit, so they
+        # are read from disk on each request, off the event loop
+        snapshot = await asyncio.to_thread(_read_snapshot, path)
+        if snapshot is None:
+            return None
+        data, stat_result = snapshot
+        etag = make_etag(path.name, lang, stat_result.st_mtime_ns, stat_result.st_size)
+        headers = {"Cache-Control": "no-cache", "ETag": etag, "Vary": "Accept-Encoding, Accept-Language, Cookie"}
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=data, media_type="text/html; charset=utf-8", headers=headers)
@@ -0,0 +1,135 @@
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+from auth import verify_session_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", Path(__file__).parent / "profiles"))
+# Keep at most this many dumps; the oldest are deleted first
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "50"))
+# Profile 1 in N requests at random (0 = only on request)
+PROFILE_SAMPLE_RATE = int(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = re.compile(rb"(^|&)profile=(1|true)(&|$)")
+
+class ProfilerMiddleware:
+    """Run selected requests under cProfile and keep the dumps on disk.
+
+    A request is profiled when an admin sends `X-Profile: 1` or `?profile=1`
+    with a valid session token, or when it is picked by PROFILE_SAMPLE_RATE.
+    Only one request per worker is profiled at a time, since the profiler
+    hooks the whole thread (other requests that run concurrently on the
+    event loop appear in the same dump). When neither trigger applies the
+    cost is a header scan.
+    """
+
+    def __init__(self, app, directory: Path = PROFILE_DIR, sample_rate: int = PROFILE_SAMPLE_RATE,
+                 max_files: int = PROFILE_MAX_FILES):
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self._active = False
+
+    def _trigger(self, scope) -> Optional[str]:
+        requested = PROFILE_QUERY.search(scope.get("query_string", b"")) is not None
+        authorization = b""
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                requested = requested or value in (b"1", b"true")
+            elif name == b"authorization":
+                authorization = value
+        if requested:
+            token = authorization.decode("latin-1").partition(" ")[2]
+            if token and verify_session_token(token) is not None:
+                return "request"
+            return None
+        if self.sample_rate and random.random() * self.sample_rate < 1:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{os.getpid()}"
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active = False
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "trigger": trigger,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            try:
+                await asyncio.to_thread(self._save, profiler, meta)
+            except OSError as e:
+                logger.warning(f"Could not save profile {profile_id}: {e}")
+
+    def _save(self, profiler: cProfile.Profile, meta: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.directory / f"{meta['id']}.prof")
+        (self.directory / f"{meta['id']}.json").write_text(json.dumps(meta))
+        # Ring buffer: ids sort by time
+        dumps = sorted(self.directory.glob("*.prof"))
+        for old in dumps[:max(0, len(dumps) - self.max_files)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+
+def list_profiles(directory: Path = PROFILE_DIR) -> List[dict]:
+    """Metadata of the stored profiles, newest first"""
+    profiles = []
+    for path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+def profile_path(profile_id: str, directory: Path = PROFILE_DIR) -> Optional[Path]:
+    if not re.fullmatch(r"[0-9T]+-\d+", profile_id):
+        return None
+    path = directory / f"{profile_id}.prof"
+    return path if path.is_file() else None
+
+def profile_summary(path: Path, sort: str = "cumulative", limit: int = 50) -> str:
+    """pstats text report of the top `limit` functions"""
+    out = io.StringIO()
+    pstats.Stats(str(path), stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
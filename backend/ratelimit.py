@@ -0,0 +1,199 @@
+import ipaddress
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# Keep buckets in the SQLite file so all gunicorn workers share one budget
+RATE_LIMIT_SHARED = os.environ.get("RATE_LIMIT_SHARED", "false").lower() in ("1", "true", "yes")
+# Active (route, client) buckets kept per worker; least recently used go first
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "10000"))
+# Shared buckets idle this long are deleted
+SHARED_BUCKET_TTL_SECONDS = 3600
+# Peers whose X-Forwarded-For is believed (comma-separated addresses or
+# networks, "*" for any): the reverse proxy in front of the workers. Defaults
+# to gunicorn's FORWARDED_ALLOW_IPS so both agree on who the client is.
+RATE_LIMIT_TRUSTED_PROXIES = os.environ.get(
+    "RATE_LIMIT_TRUSTED_PROXIES", os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+)
+
+class RateLimitRule:
+    """Token bucket refilled at `per_minute`, holding up to `burst` requests,
+    plus a cap on requests to the route in flight at once in this worker."""
+
+    def __init__(self, name: str, method: str, path: str, per_minute: float, burst: int,
+                 max_concurrency: Optional[int] = None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+
+    @classmethod
+    def from_env(cls, name: str, method: str, path: str, per_minute: float, burst: int, max_concurrency: int):
+        prefix = f"RATE_LIMIT_{name.upper()}"
+        return cls(
+            name,
+            method,
+            path,
+            float(os.environ.get(f"{prefix}_PER_MINUTE", per_minute)),
+            int(os.environ.get(f"{prefix}_BURST", burst)),
+            int(os.environ.get(f"{prefix}_CONCURRENCY", max_concurrency)),
+        )
+
+class LocalBuckets:
+    """Token buckets in an LRU dict: two floats per active key, bounded in count"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+
+    async def take(self, rule: RateLimitRule, client: str) -> float:
+        """Consume a token; returns 0 if allowed, else seconds until one is available"""
+        key = (rule.name, client)
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(rule.burst), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(rule.burst, bucket[0] + (now - bucket[1]) * rule.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0
+        return (1 - bucket[0]) / rule.rate
+
+class SharedBuckets:
+    """Token buckets in the rate_limit_buckets table, updated with one upsert per request"""
+
+    TAKE = text(
+        "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (:key, :burst - 1, :now) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        "tokens = min(:burst, tokens + (:now - updated_at) * :rate) - 1, updated_at = :now "
+        "WHERE min(:burst, tokens + (:now - updated_at) * :rate) >= 1 "
+        "RETURNING tokens"
+    )
+    PEEK = text("SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = :key")
+    PRUNE = text("DELETE FROM rate_limit_buckets WHERE updated_at < :cutoff")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._pruned_at = 0.0
+
+    async def take(self, rule: RateLimitRule, client: str) -> float:
+        # Wall clock, since workers do not share a monotonic clock
+        now = time.time()
+        params = {"key": f"{rule.name}|{client}", "burst": rule.burst, "rate": rule.rate, "now": now}
+        async with self.engine.begin() as conn:
+            if now - self._pruned_at > SHARED_BUCKET_TTL_SECONDS:
+                self._pruned_at = now
+                await conn.execute(self.PRUNE, {"cutoff": now - SHARED_BUCKET_TTL_SECONDS})
+            if (await conn.execute(self.TAKE, params)).first() is not None:
+                return 0
+            tokens, updated_at = (await conn.execute(self.PEEK, params)).one()
+        tokens = min(rule.burst, tokens + (now - updated_at) * rule.rate)
+        return max(0.0, (1 - tokens) / rule.rate)
+
+class TrustedProxies:
+    """Resolves the client address behind trusted reverse proxies"""
+
+    def __init__(self, spec: str):
+        entries = [entry.strip() for entry in spec.split(",") if entry.strip()]
+        self.trust_all = "*" in entries
+        self.networks = [ipaddress.ip_network(entry, strict=False) for entry in entries if entry != "*"]
+
+    def trusts(self, address: str) -> bool:
+        if self.trust_all:
+            return True
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.networks)
+
+    def client(self, scope) -> str:
+        peer = scope["client"][0] if scope.get("client") else "unknown"
+        if not self.trusts(peer):
+            return peer
+        forwarded = ",".join(
+            value.decode("latin-1") for name, value in scope["headers"] if name == b"x-forwarded-for"
+        )
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        # Each proxy appends the address it saw; the first untrusted one from
+        # the right is the client (anything left of it can be forged)
+        for hop in reversed(hops):
+            if not self.trusts(hop):
+                return hop
+        return hops[0] if hops else peer
+
+class RateLimitMiddleware:
+    """Admission control for expensive public endpoints.
+
+    A plain ASGI middleware, so rejected requests are answered before the
+    body is read, a dependency is resolved or the DB is touched. Clients are
+    keyed by the connection address, or by X-Forwarded-For when the
+    connection comes from one of `trusted_proxies`; otherwise every visitor
+    behind nginx would share the proxy's bucket.
+    """
+
+    def __init__(self, app, rules: List[RateLimitRule], buckets=None, enabled: bool = RATE_LIMIT_ENABLED,
+                 trusted_proxies: str = RATE_LIMIT_TRUSTED_PROXIES):
+        self.app = app
+        self.rules: Dict[Tuple[str, str], RateLimitRule] = {(rule.method, rule.path): rule for rule in rules}
+        self.buckets = buckets or LocalBuckets()
+        self.enabled = enabled
+        self.trusted_proxies = TrustedProxies(trusted_proxies)
+
+    async def __call__(self, scope, receive, send):
+        rule = None
+        if self.enabled and scope["type"] == "http":
+            rule = self.rules.get((scope["method"], scope["path"].rstrip("/")))
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = self.trusted_proxies.client(scope)
+        try:
+            retry_after = await self.buckets.take(rule, client)
+        except Exception as e:
+            # Never turn a limiter problem into an outage
+            logger.warning(f"Rate limiter unavailable, admitting request: {e}")
+            retry_after = 0
+        if retry_after:
+            await _reject(send, 429, "Too many requests, please try again later", retry_after)
+            return
+        if rule.max_concurrency and rule.in_flight >= rule.max_concurrency:
+            await _reject(send, 503, "Server is busy, please try again shortly", 1)
+            return
+
+        rule.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            rule.in_flight -= 1
+
+async def _reject(send, status_code: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,171 @@
+import re
+from typing import List, Optional
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SEARCH_LANGUAGES = ("tr", "en", "de", "ru")
+
+# One FTS5 table per language so each gets its own tokenizer. unicode61 with
+# remove_diacritics folds ö/ü/ş/ç/ğ, German umlauts and Russian ё; English
+# additionally gets Porter stemming.
+LANG_TOKENIZERS = {
+    "tr": "unicode61 remove_diacritics 2",
+    "en": "porter unicode61 remove_diacritics 2",
+    "de": "unicode61 remove_diacritics 2",
+    "ru": "unicode61 remove_diacritics 2",
+}
+
+SNIPPET_RADIUS = 80
+# Private-use characters that never occur in post text
+HIGHLIGHT_OPEN = "\ue000"
+HIGHLIGHT_CLOSE = "\ue001"
+
+# Turkish I/İ/ı/i all fold to "i" so "ISTANBUL", "İstanbul" and "ıstanbul" match,
+# and Russian ё folds to е (unicode61 only strips Latin diacritics). Applied
+# before str.lower(), which keeps the folding one character for one character
+# (İ is the only letter whose default lowercase is longer).
+_SEARCH_FOLD = str.maketrans({"İ": "i", "I": "i", "ı": "i", "Ё": "е", "ё": "е"})
+
+def fold_text(value: str) -> str:
+    """Case-fold text for indexing and querying without changing its length"""
+    return value.translate(_SEARCH_FOLD).lower()
+
+def fts_table(lang: str) -> str:
+    return f"blog_posts_fts_{lang}"
+
+async def create_search_tables(conn):
+    """Create the per-language FTS5 tables and backfill them on first run"""
+    for lang in SEARCH_LANGUAGES:
+        await conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table(lang)} "
+            f"USING fts5(post_id UNINDEXED, title, content, tokenize='{LANG_TOKENIZERS[lang]}')"
+        )
+    result = await conn.exec_driver_sql(f"SELECT count(*) FROM {fts_table('tr')}")
+    if result.scalar() == 0:
+        for lang in SEARCH_LANGUAGES:
+            rows = (await conn.exec_driver_sql(
+                "SELECT p.id, COALESCE(t.value, ''), COALESCE(c.value, '') FROM blog_posts p "
+                "LEFT JOIN translations t ON t.entity_id = p.id AND t.lang = ? AND t.field = 'title' "
+                "LEFT JOIN translations c ON c.entity_id = p.id AND c.lang = ? AND c.field = 'content'",
+                (lang, lang),
+            )).all()
+            for post_id, title, content in rows:
+                await conn.exec_driver_sql(
+                    f"INSERT INTO {fts_table(lang)} (post_id, title, content) VALUES (?, ?, ?)",
+                    (post_id, fold_text(title), fold_text(content)),
+                )
+
+async def index_blog_post(db: AsyncSession, post_id: str, post):
+    """(Re)index a post's text in every language, inside the caller's transaction"""
+    for lang in SEARCH_LANGUAGES:
+        await db.execute(text(f"DELETE FROM {fts_table(lang)} WHERE post_id = :post_id"), {"post_id": post_id})
+        await db.execute(
+            text(f"INSERT INTO {fts_table(lang)} (post_id, title, content) VALUES (:post_id, :title, :content)"),
+            {
+                "post_id": post_id,
+                "title": fold_text(getattr(post, f"title_{lang}")),
+                "content": fold_text(getattr(post, f"content_{lang}")),
+            },
+        )
+
+async def unindex_blog_post(db: AsyncSession, post_id: str):
+    await unindex_blog_posts(db, [post_id])
+
+async def unindex_blog_posts(db: AsyncSession, post_ids: List[str]):
+    for lang in SEARCH_LANGUAGES:
+        statement = text(f"DELETE FROM {fts_table(lang)} WHERE post_id IN :post_ids").bindparams(
+            bindparam("post_ids", expanding=True)
+        )
+        await db.execute(statement, {"post_ids": list(post_ids)})
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    tokens = re.findall(r"\w+", fold_text(query))
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def _marked_ranges(highlighted: str):
+    """Character ranges between highlight markers, in unmarked coordinates"""
+    ranges = []
+    position = 0
+    start = None
+    for char in highlighted:
+        if char == HIGHLIGHT_OPEN:
+            start = position
+        elif char == HIGHLIGHT_CLOSE:
+            ranges.append((start, position))
+        else:
+            position += 1
+    return ranges
+
+def make_snippet(original: str, highlighted: str, radius: int = SNIPPET_RADIUS):
+    """Cut a window of the original text around the first match.
+
+    The indexed text is `fold_text(original)`, which has the same length as
+    the original, so match offsets from FTS5 apply to the original as is.
+    Returns the snippet and the match ranges relative to it.
+    """
+    ranges = _marked_ranges(highlighted)
+    if not ranges:
+        snippet = original[:2 * radius]
+        return snippet + ("…" if len(original) > len(snippet) else ""), []
+    start = max(0, ranges[0][0] - radius)
+    end = min(len(original), ranges[0][1] + radius)
+    # Widen to word boundaries
+    while start > 0 and not original[start - 1].isspace():
+        start -= 1
+    while end < len(original) and not original[end].isspace():
+        end += 1
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(original) else ""
+    offset = len(prefix) - start
+    highlights = [(s + offset, e + offset) for s, e in ranges if s >= start and e <= end]
+    return prefix + original[start:end] + suffix, highlights
+
+async def search_blog_posts(db: AsyncSession, query: str, lang: str, limit: int, published_only: bool = True):
+    """Rank one language's posts with BM25 (titles weigh 5x) and return raw hits"""
+    match = build_match_query(query)
+    if match is None:
+        return []
+    table = fts_table(lang)
+    sql = (
+        f"SELECT p.id, p.slug, p.created_at, COALESCE(t.value, '') AS title, COALESCE(c.value, '') AS content, "
+        f"highlight({table}, 1, :open, :close) AS title_hl, "
+        f"highlight({table}, 2, :open, :close) AS content_hl, "
+        f"bm25({table}, 0.0, 5.0, 1.0) AS score "
+        f"FROM {table} JOIN blog_posts p ON p.id = {table}.post_id "
+        f"LEFT JOIN translations t ON t.entity_id = p.id AND t.lang = :lang AND t.field = 'title' "
+        f"LEFT JOIN translations c ON c.entity_id = p.id AND c.lang = :lang AND c.field = 'content' "
+        f"WHERE {table} MATCH :match"
+        + (" AND p.published = 1" if published_only else "")
+        + " ORDER BY score LIMIT :limit"
+    )
+    result = await db.execute(
+        text(sql), {"match": match, "lang": lang, "open": HIGHLIGHT_OPEN, "close": HIGHLIGHT_CLOSE, "limit": limit}
+    )
+    hits = []
+    for row in result.mappings():
+        snippet, highlights = make_snippet(row["content"], row["content_hl"])
+        hits.append({
+            "id": row["id"],
+            "slug": row["slug"],
+            "lang": lang,
+            "title": row["title"],
+            "title_highlights": _marked_ranges(row["title_hl"]),
+            "snippet": snippet,
+            "highlights": highlights,
+            # bm25() is lower-is-better; expose higher-is-better
+            "score": -row["score"],
+            "created_at": row["created_at"],
+        })
+    return hits
+
+async def search_all_languages(db: AsyncSession, query: str, limit: int, published_only: bool = True) -> List[dict]:
+    """Search every language and keep each post's best-scoring hit"""
+    best = {}
+    for lang in SEARCH_LANGUAGES:
+        for hit in await search_blog_posts(db, query, lang, limit, published_only):
+            if hit["id"] not in best or hit["score"] > best[hit["id"]]["score"]:
+                best[hit["id"]] = hit
+    return sorted(best.values(), key=lambda hit: hit["score"], reverse=True)[:limit]
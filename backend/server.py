@@ -1,24 +1,45 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 import uuid
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, func, tuple_, case
 from database import (
-    get_database, create_tables, 
-    ContactMessageDB, BlogPostDB, AdminUserDB, SiteSettingsDB, PasswordResetDB
+    get_database, get_read_database, create_tables, close_database, engine, SessionLocal, ReadSessionLocal,
+    ContactMessageDB, BlogPostDB, AdminUserDB, SiteSettingsDB, PasswordResetDB,
+    BLOG_TRANSLATED_FIELDS, SETTINGS_TRANSLATED_FIELDS, DEFAULT_LANGUAGE
 )
-import hashlib
-import shutil
+from cache import cache_versions, response_cache, bump_cache_version
+from http_cache import make_etag, body_etag, is_not_modified, validator_headers, not_modified_response
+from static_files import FrontendManifest
+from images import process_upload, shutdown_pool
+from uploads import receive_image_upload, UploadIndex
+from translations import translated_columns, with_translations, save_translations, delete_translations
+from search import index_blog_post, unindex_blog_post, unindex_blog_posts, search_blog_posts, search_all_languages
+from write_queue import WriteBehindQueue
+from fast_json import FastJSONResponse, rows_to_dicts
+from export import ExportFormat, export_response
+from events import MessageEventHub, record_message_event
+from metrics import MetricsMiddleware, MetricsStore, render_prometheus
+from profiling import ProfilerMiddleware, list_profiles, profile_path, profile_summary
+from ratelimit import RateLimitMiddleware, RateLimitRule, LocalBuckets, SharedBuckets, RATE_LIMIT_SHARED
+from auth import (
+    require_admin, optional_admin, create_session_token, hash_password, verify_password, needs_rehash
+)
+from prerender import Prerenderer
+from notifications import NotificationWorker, transport_from_env, enqueue_notification, enqueue_message_notification
+import asyncio
+import base64
+import hmac
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -29,10 +50,43 @@ app = FastAPI()
 # Mount static files for uploads
 app.mount("/uploads", StaticFiles(directory=f"{ROOT_DIR}/uploads"), name="uploads")
 
-# Mount frontend build directory
+# Frontend build directory, indexed at startup and served by serve_frontend
 FRONTEND_BUILD_DIR = ROOT_DIR.parent / "frontend" / "build"
-if FRONTEND_BUILD_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(FRONTEND_BUILD_DIR / "static")), name="static")
+frontend_manifest = FrontendManifest(FRONTEND_BUILD_DIR)
+
+# Email/webhook notifications, delivered from the notification_outbox table
+# by a background worker (disabled unless NOTIFY_TRANSPORT is set)
+notification_worker = NotificationWorker(transport_from_env(), SessionLocal)
+PUBLIC_BASE_URL = os.environ.get("PUBLIC_BASE_URL", "https://hancer-attorney.preview.emergentagent.com")
+# Local development without a mail transport only: return password reset
+# links in the forgot-password response instead of mailing them
+RESET_LINK_IN_RESPONSE = os.environ.get("RESET_LINK_IN_RESPONSE", "false").lower() in ("1", "true", "yes")
+
+# Live inbox updates for the admin panel (GET /api/messages/events), fanned
+# out across workers through the message_events table
+message_events = MessageEventHub(ReadSessionLocal, SessionLocal)
+
+async def record_new_messages(db: AsyncSession, rows: List[dict]):
+    """Inbox event and notification for new messages, in the inserting transaction"""
+    for row in rows:
+        record_message_event(db, "created", row["id"], row)
+    message_events.wake()
+    if notification_worker.enabled:
+        for row in rows:
+            enqueue_message_notification(db, row)
+        notification_worker.wake()
+
+# Optional write-behind for contact form submissions: acknowledge once the
+# message is fsynced to a spool file and insert in batches shortly after
+MESSAGE_WRITE_BEHIND = os.environ.get("MESSAGE_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+message_queue = WriteBehindQueue(
+    ContactMessageDB,
+    SessionLocal,
+    ROOT_DIR / "spool",
+    flush_interval=int(os.environ.get("MESSAGE_FLUSH_INTERVAL_MS", "50")) / 1000,
+    max_batch=int(os.environ.get("MESSAGE_FLUSH_MAX_BATCH", "200")),
+    on_insert=record_new_messages,
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -70,6 +124,22 @@ class UrgencyLevel(str, Enum):
     HIGH = "high"
     URGENT = "urgent"
 
+class BulkMessageAction(str, Enum):
+    MARK_READ = "mark_read"
+    MARK_UNREAD = "mark_unread"
+    DELETE = "delete"
+
+class BulkBlogAction(str, Enum):
+    PUBLISH = "publish"
+    UNPUBLISH = "unpublish"
+    DELETE = "delete"
+
+class UploadKind(str, Enum):
+    JPEG = "jpeg"
+    PNG = "png"
+    WEBP = "webp"
+    SVG = "svg"
+
 # Models
 class ContactMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -83,6 +153,61 @@ class ContactMessage(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     is_read: bool = False
 
+class MessageFilter(BaseModel):
+    is_read: Optional[bool] = None
+    urgency: Optional[UrgencyLevel] = None
+    legal_area: Optional[LegalAreaType] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.is_read is not None:
+            conditions.append(ContactMessageDB.is_read == self.is_read)
+        if self.urgency:
+            conditions.append(ContactMessageDB.urgency == self.urgency.value)
+        if self.legal_area:
+            conditions.append(ContactMessageDB.legal_area == self.legal_area.value)
+        if self.created_from:
+            conditions.append(ContactMessageDB.created_at >= naive_utc(self.created_from))
+        if self.created_to:
+            conditions.append(ContactMessageDB.created_at < naive_utc(self.created_to))
+        return conditions
+
+class BlogFilter(BaseModel):
+    published: Optional[bool] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.published is not None:
+            conditions.append(BlogPostDB.published == self.published)
+        if self.created_from:
+            conditions.append(BlogPostDB.created_at >= naive_utc(self.created_from))
+        if self.created_to:
+            conditions.append(BlogPostDB.created_at < naive_utc(self.created_to))
+        return conditions
+
+class MessageBulkRequest(BaseModel):
+    action: BulkMessageAction
+    # Messages are selected by ids, by filter, or by both combined
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[MessageFilter] = None
+
+class BlogBulkRequest(BaseModel):
+    action: BulkBlogAction
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+class BulkResult(BaseModel):
+    affected: int
+
+class MessageStats(BaseModel):
+    total: int
+    unread: int
+    unread_by_urgency: dict
+    unread_by_legal_area: dict
+
 class ContactMessageCreate(BaseModel):
     name: str
     email: str
@@ -107,6 +232,41 @@ class BlogPost(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class BlogPostSummary(BaseModel):
+    id: str
+    slug: str
+    title_tr: str
+    title_en: str
+    title_de: str
+    title_ru: str
+    published: bool = True
+    created_at: datetime
+    updated_at: datetime
+
+class BlogPostLocalizedSummary(BaseModel):
+    id: str
+    slug: str
+    lang: LanguageCode
+    title: str
+    published: bool = True
+    created_at: datetime
+    updated_at: datetime
+
+class BlogPostLocalized(BlogPostLocalizedSummary):
+    content: str
+
+class BlogSearchResult(BaseModel):
+    id: str
+    slug: str
+    lang: LanguageCode
+    title: str
+    title_highlights: List[Tuple[int, int]] = []
+    snippet: str
+    # [start, end) character offsets of matched terms within the snippet
+    highlights: List[Tuple[int, int]] = []
+    score: float
+    created_at: datetime
+
 class BlogPostCreate(BaseModel):
     title_tr: str
     title_en: str
@@ -147,6 +307,18 @@ class SiteSettings(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class SiteSettingsLocalized(BaseModel):
+    id: str
+    lang: LanguageCode
+    logo_url: str = ""
+    hero_title: str = ""
+    hero_subtitle: str = ""
+    hero_description: str = ""
+    about_company: str = ""
+    about_founder: str = ""
+    created_at: datetime
+    updated_at: datetime
+
 class SiteSettingsUpdate(BaseModel):
     logo_url: str = ""
     # Hero section
@@ -195,6 +367,12 @@ class AdminLoginRequest(BaseModel):
     password: str
 
 # Helper functions
+def naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; convert aware values before comparing"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 def db_to_pydantic_message(db_obj) -> ContactMessage:
     return ContactMessage(
         id=db_obj.id,
@@ -209,92 +387,241 @@ def db_to_pydantic_message(db_obj) -> ContactMessage:
         is_read=db_obj.is_read
     )
 
-def db_to_pydantic_blog(db_obj) -> BlogPost:
-    return BlogPost(
-        id=db_obj.id,
-        title_tr=db_obj.title_tr,
-        title_en=db_obj.title_en,
-        title_de=db_obj.title_de,
-        title_ru=db_obj.title_ru,
-        content_tr=db_obj.content_tr,
-        content_en=db_obj.content_en,
-        content_de=db_obj.content_de,
-        content_ru=db_obj.content_ru,
-        slug=db_obj.slug,
-        published=db_obj.published,
-        created_at=db_obj.created_at,
-        updated_at=db_obj.updated_at
-    )
+def blog_query(*group_by):
+    """Every column of a post, with title/content in all languages (the BlogPost shape).
 
-def db_to_pydantic_settings(db_obj) -> SiteSettings:
-    return SiteSettings(
-        id=db_obj.id,
-        logo_url=db_obj.logo_url or "",
-        hero_title_tr=db_obj.hero_title_tr or "",
-        hero_title_en=db_obj.hero_title_en or "",
-        hero_title_de=db_obj.hero_title_de or "",
-        hero_title_ru=db_obj.hero_title_ru or "",
-        hero_subtitle_tr=db_obj.hero_subtitle_tr or "",
-        hero_subtitle_en=db_obj.hero_subtitle_en or "",
-        hero_subtitle_de=db_obj.hero_subtitle_de or "",
-        hero_subtitle_ru=db_obj.hero_subtitle_ru or "",
-        hero_description_tr=db_obj.hero_description_tr or "",
-        hero_description_en=db_obj.hero_description_en or "",
-        hero_description_de=db_obj.hero_description_de or "",
-        hero_description_ru=db_obj.hero_description_ru or "",
-        about_company_tr=db_obj.about_company_tr or "",
-        about_company_en=db_obj.about_company_en or "",
-        about_company_de=db_obj.about_company_de or "",
-        about_company_ru=db_obj.about_company_ru or "",
-        about_founder_tr=db_obj.about_founder_tr or "",
-        about_founder_en=db_obj.about_founder_en or "",
-        about_founder_de=db_obj.about_founder_de or "",
-        about_founder_ru=db_obj.about_founder_ru or "",
-        created_at=db_obj.created_at,
-        updated_at=db_obj.updated_at
+    Pass the columns the caller orders by as `group_by` (see with_translations).
+    """
+    return with_translations(select(*BlogPostDB.__table__.c), BlogPostDB.id, BLOG_TRANSLATED_FIELDS, group_by)
+
+def db_to_pydantic_blog(row) -> BlogPost:
+    """BlogPost from a row selected with blog_query()"""
+    return BlogPost(**row._mapping)
+
+def settings_query(lang: Optional[LanguageCode] = None):
+    """Site settings in every language (the SiteSettings shape), or one language's texts"""
+    if lang:
+        return select(
+            *SiteSettingsDB.__table__.c,
+            *translated_columns(SiteSettingsDB.id, SETTINGS_TRANSLATED_FIELDS, lang.value),
+        )
+    return with_translations(select(*SiteSettingsDB.__table__.c), SiteSettingsDB.id, SETTINGS_TRANSLATED_FIELDS)
+
+def db_to_pydantic_settings(row) -> SiteSettings:
+    """SiteSettings from a row selected with settings_query()"""
+    return SiteSettings(**{**row._mapping, "logo_url": row.logo_url or ""})
+
+def localized_blog_columns(lang: LanguageCode, include_content: bool = True):
+    """Select only one language's title/content, falling back to Turkish when empty"""
+    fields = BLOG_TRANSLATED_FIELDS if include_content else ("title",)
+    return [
+        BlogPostDB.id,
+        BlogPostDB.slug,
+        *translated_columns(BlogPostDB.id, fields, lang.value, fallback=DEFAULT_LANGUAGE),
+        BlogPostDB.published,
+        BlogPostDB.created_at,
+        BlogPostDB.updated_at,
+    ]
+
+def summary_blog_query(*group_by):
+    """Select every language's title but none of the content"""
+    return with_translations(
+        select(BlogPostDB.id, BlogPostDB.slug, BlogPostDB.published, BlogPostDB.created_at, BlogPostDB.updated_at),
+        BlogPostDB.id, ("title",), group_by,
     )
 
+def model_response(model: BaseModel, headers: Optional[dict] = None) -> Response:
+    """JSON response with explicit headers, for endpoints whose responses are cached"""
+    return Response(content=model.model_dump_json(), media_type="application/json", headers=headers)
+
+def row_to_localized_blog(row, lang: LanguageCode):
+    if "content" in row._fields:
+        return BlogPostLocalized(lang=lang, **row._mapping)
+    return BlogPostLocalizedSummary(lang=lang, **row._mapping)
+
+def require_admin_for_drafts(published_only: bool, admin: Optional[dict]):
+    """Unpublished posts are only listed for a signed-in admin"""
+    if not published_only:
+        require_admin(admin)
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque keyset cursor for lists ordered by (created_at, id) descending"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 # API Routes
 
 # Contact Messages
 @api_router.post("/messages", response_model=ContactMessage)
 async def create_message(message_data: ContactMessageCreate, db: AsyncSession = Depends(get_database)):
     """Create a new contact message"""
-    message_id = str(uuid.uuid4())
-    db_message = ContactMessageDB(
-        id=message_id,
-        name=message_data.name,
-        email=message_data.email,
-        phone=message_data.phone,
-        subject=message_data.subject,
-        legal_area=message_data.legal_area.value,
-        urgency=message_data.urgency.value,
-        message=message_data.message,
-        created_at=datetime.now(timezone.utc),
-        is_read=False
+    row = {
+        "id": str(uuid.uuid4()),
+        "name": message_data.name,
+        "email": message_data.email,
+        "phone": message_data.phone,
+        "subject": message_data.subject,
+        "legal_area": message_data.legal_area.value,
+        "urgency": message_data.urgency.value,
+        "message": message_data.message,
+        "created_at": naive_utc(datetime.now(timezone.utc)),
+        "is_read": False,
+    }
+    if MESSAGE_WRITE_BEHIND:
+        await message_queue.submit(row)
+    else:
+        db.add(ContactMessageDB(**row))
+        await record_new_messages(db, [row])
+        await db.commit()
+        message_events.wake()
+    # Every column is known up front, so no refresh round trip is needed
+    return ContactMessage(**row)
+
+@api_router.get("/messages", response_model=List[ContactMessage], dependencies=[Depends(require_admin)])
+async def get_messages(
+    filters: MessageFilter = Depends(),
+    preview_length: Optional[int] = Query(None, ge=1, le=5000),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_database)
+):
+    """Get contact messages, newest first (admin only).
+
+    `preview_length` truncates message bodies in SQL. With `limit`, the next
+    page is available through the `X-Next-Cursor` response header.
+    """
+    columns = [column for column in ContactMessageDB.__table__.c if column.name != "message"]
+    if preview_length:
+        query = select(*columns, func.substr(ContactMessageDB.message, 1, preview_length).label("message"))
+    else:
+        query = select(*columns, ContactMessageDB.message)
+    query = query.where(*filters.conditions()).order_by(
+        ContactMessageDB.created_at.desc(), ContactMessageDB.id.desc()
     )
-    db.add(db_message)
-    await db.commit()
-    await db.refresh(db_message)
-    return db_to_pydantic_message(db_message)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(ContactMessageDB.created_at, ContactMessageDB.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    if limit:
+        query = query.limit(limit + 1)
+
+    headers = {}
+    if not cursor:
+        # Read first: passed as Last-Event-ID to /messages/events, changes
+        # made after it are replayed there
+        headers["X-Last-Event-Id"] = str(await message_events.latest_id(db))
+    # Rows already match ContactMessage; encode them without building models
+    messages = rows_to_dicts((await db.execute(query)).mappings())
+    if limit and len(messages) > limit:
+        messages = messages[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(messages[-1]["created_at"], messages[-1]["id"])
+    return FastJSONResponse(messages, headers=headers)
+
+@api_router.get("/messages/events", dependencies=[Depends(require_admin)])
+async def stream_message_events(last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events for new, read and deleted messages (admin only).
+
+    Resumes after `Last-Event-ID` (the `X-Last-Event-Id` of GET /messages,
+    or the last event received); without it, starts from now. A `reset`
+    event means the position is too old to replay and the inbox should be
+    reloaded.
+    """
+    position = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return StreamingResponse(
+        message_events.stream(position),
+        media_type="text/event-stream",
+        # Stop nginx from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/messages/export", dependencies=[Depends(require_admin)])
+async def export_messages(
+    filters: MessageFilter = Depends(),
+    format: ExportFormat = ExportFormat.NDJSON,
+    compress: bool = False
+):
+    """Stream matching messages, oldest first, as NDJSON or CSV (admin only)"""
+    query = (
+        select(*ContactMessageDB.__table__.c)
+        .where(*filters.conditions())
+        .order_by(ContactMessageDB.created_at, ContactMessageDB.id)
+    )
+    return export_response(ReadSessionLocal, query, format, "messages", compress)
+
+@api_router.get("/messages/stats", response_model=MessageStats, dependencies=[Depends(require_admin)])
+async def get_message_stats(db: AsyncSession = Depends(get_read_database)):
+    """Message totals and unread counts by urgency and legal area (admin only)"""
+    result = await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((ContactMessageDB.is_read == False, 1), else_=0)), 0)
+        ).select_from(ContactMessageDB)
+    )
+    total, unread = result.one()
+
+    unread_by = {}
+    for column in (ContactMessageDB.urgency, ContactMessageDB.legal_area):
+        result = await db.execute(
+            select(column, func.count())
+            .where(ContactMessageDB.is_read == False)
+            .group_by(column)
+        )
+        unread_by[column.name] = dict(result.all())
+
+    return MessageStats(
+        total=total,
+        unread=unread,
+        unread_by_urgency=unread_by["urgency"],
+        unread_by_legal_area=unread_by["legal_area"]
+    )
+
+@api_router.post("/messages/bulk", response_model=BulkResult, dependencies=[Depends(require_admin)])
+async def bulk_update_messages(request: MessageBulkRequest, db: AsyncSession = Depends(get_database)):
+    """Mark read/unread or delete many messages in one statement (admin only)"""
+    conditions = request.filter.conditions() if request.filter else []
+    if request.ids:
+        conditions.append(ContactMessageDB.id.in_(request.ids))
+    if not conditions:
+        # An empty selection would match the whole inbox
+        raise HTTPException(status_code=400, detail="Provide ids or a non-empty filter")
 
-@api_router.get("/messages", response_model=List[ContactMessage])
-async def get_messages(db: AsyncSession = Depends(get_database)):
-    """Get all contact messages (admin only)"""
-    result = await db.execute(select(ContactMessageDB).order_by(ContactMessageDB.created_at.desc()))
-    messages = result.scalars().all()
-    return [db_to_pydantic_message(msg) for msg in messages]
+    if request.action == BulkMessageAction.DELETE:
+        statement = delete(ContactMessageDB).where(*conditions)
+    else:
+        statement = (
+            update(ContactMessageDB)
+            .where(*conditions)
+            .values(is_read=request.action == BulkMessageAction.MARK_READ)
+        )
+    result = await db.execute(statement.execution_options(synchronize_session=False))
+    if result.rowcount:
+        # Affected ids are not known for filter selections; clients reload
+        record_message_event(db, "changed", data={"action": request.action.value})
+    await db.commit()
+    message_events.wake()
+    return BulkResult(affected=result.rowcount)
 
-@api_router.delete("/messages/{message_id}")
+@api_router.delete("/messages/{message_id}", dependencies=[Depends(require_admin)])
 async def delete_message(message_id: str, db: AsyncSession = Depends(get_database)):
     """Delete a contact message"""
     result = await db.execute(delete(ContactMessageDB).where(ContactMessageDB.id == message_id))
-    await db.commit()
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Message not found")
+    record_message_event(db, "deleted", message_id)
+    await db.commit()
+    message_events.wake()
     return {"message": "Message deleted successfully"}
 
-@api_router.put("/messages/{message_id}/read")
+@api_router.put("/messages/{message_id}/read", dependencies=[Depends(require_admin)])
 async def mark_message_read(message_id: str, db: AsyncSession = Depends(get_database)):
     """Mark message as read"""
     result = await db.execute(
@@ -302,200 +629,383 @@ async def mark_message_read(message_id: str, db: AsyncSession = Depends(get_data
         .where(ContactMessageDB.id == message_id)
         .values(is_read=True)
     )
-    await db.commit()
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Message not found")
+    record_message_event(db, "read", message_id)
+    await db.commit()
+    message_events.wake()
     return {"message": "Message marked as read"}
 
 # Blog Posts
-@api_router.post("/blog", response_model=BlogPost)
+@api_router.post("/blog", response_model=BlogPost, dependencies=[Depends(require_admin)])
 async def create_blog_post(post_data: BlogPostCreate, db: AsyncSession = Depends(get_database)):
     """Create a new blog post"""
     post_id = str(uuid.uuid4())
-    db_post = BlogPostDB(
+    now = datetime.now(timezone.utc)
+    db.add(BlogPostDB(
         id=post_id,
-        title_tr=post_data.title_tr,
-        title_en=post_data.title_en,
-        title_de=post_data.title_de,
-        title_ru=post_data.title_ru,
-        content_tr=post_data.content_tr,
-        content_en=post_data.content_en,
-        content_de=post_data.content_de,
-        content_ru=post_data.content_ru,
         slug=post_data.slug,
         published=post_data.published,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc)
-    )
-    db.add(db_post)
+        created_at=now,
+        updated_at=now
+    ))
+    await save_translations(db, post_id, BLOG_TRANSLATED_FIELDS, post_data)
+    await index_blog_post(db, post_id, post_data)
+    await bump_cache_version(db, "blog")
     await db.commit()
-    await db.refresh(db_post)
-    return db_to_pydantic_blog(db_post)
+    cache_versions.expire()
+    prerenderer.posts_changed(post_id)
+    return BlogPost(id=post_id, created_at=now, updated_at=now, **post_data.model_dump())
+
+@api_router.get(
+    "/blog",
+    response_model=List[Union[BlogPostLocalized, BlogPostLocalizedSummary, BlogPost, BlogPostSummary]]
+)
+async def get_blog_posts(
+    request: Request,
+    published_only: bool = True,
+    lang: Optional[LanguageCode] = None,
+    include_content: bool = True,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_database),
+    admin: Optional[dict] = Depends(optional_admin)
+):
+    """Get blog posts, newest first.
 
-@api_router.get("/blog", response_model=List[BlogPost])
-async def get_blog_posts(published_only: bool = True, db: AsyncSession = Depends(get_database)):
-    """Get blog posts"""
-    query = select(BlogPostDB).order_by(BlogPostDB.created_at.desc())
+    With `limit`, the next page is available through the `X-Next-Cursor`
+    response header, which is passed back as `cursor`.
+    """
+    require_admin_for_drafts(published_only, admin)
+    if published_only:
+        return await response_cache.get_or_build(
+            request, db, ["blog"],
+            lambda: build_blog_list(request, published_only, lang, include_content, limit, cursor, db)
+        )
+    return await build_blog_list(request, published_only, lang, include_content, limit, cursor, db)
+
+async def build_blog_list(
+    request: Request,
+    published_only: bool,
+    lang: Optional[LanguageCode],
+    include_content: bool,
+    limit: Optional[int],
+    cursor: Optional[str],
+    db: AsyncSession
+) -> Response:
+    # Deleting a post moves no timestamp, so the list is validated by
+    # ETag (row count + newest update) only, without Last-Modified.
+    validator = select(func.count(), func.max(BlogPostDB.updated_at)).select_from(BlogPostDB)
+    if published_only:
+        validator = validator.where(BlogPostDB.published == True)
+    count, newest = (await db.execute(validator)).one()
+    etag = make_etag("blog", request.url.query, count, newest)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    headers = validator_headers(etag)
+
+    if lang:
+        query = select(*localized_blog_columns(lang, include_content))
+    elif not include_content:
+        query = summary_blog_query(BlogPostDB.created_at, BlogPostDB.id)
+    else:
+        query = blog_query(BlogPostDB.created_at, BlogPostDB.id)
+    query = query.order_by(BlogPostDB.created_at.desc(), BlogPostDB.id.desc())
     if published_only:
         query = query.where(BlogPostDB.published == True)
-    
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(BlogPostDB.created_at, BlogPostDB.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    if limit:
+        # Fetch one extra row to know whether another page exists
+        query = query.limit(limit + 1)
+
+    # Selected columns already match the response models; encode rows directly
     result = await db.execute(query)
-    posts = result.scalars().all()
-    return [db_to_pydantic_blog(post) for post in posts]
+    posts = rows_to_dicts(result.mappings(), {"lang": lang.value} if lang else None)
+
+    if limit and len(posts) > limit:
+        posts = posts[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(posts[-1]["created_at"], posts[-1]["id"])
+    return FastJSONResponse(posts, headers=headers)
+
+@api_router.post("/blog/bulk", response_model=BulkResult, dependencies=[Depends(require_admin)])
+async def bulk_update_blog_posts(request: BlogBulkRequest, db: AsyncSession = Depends(get_database)):
+    """Publish, unpublish or delete many blog posts in one transaction"""
+    condition = BlogPostDB.id.in_(request.ids)
+    if request.action == BulkBlogAction.DELETE:
+        result = await db.execute(
+            delete(BlogPostDB).where(condition).execution_options(synchronize_session=False)
+        )
+        await delete_translations(db, request.ids)
+        await unindex_blog_posts(db, request.ids)
+    else:
+        published = request.action == BulkBlogAction.PUBLISH
+        result = await db.execute(
+            update(BlogPostDB)
+            .where(condition, BlogPostDB.published != published)
+            .values(published=published, updated_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+    if result.rowcount:
+        await bump_cache_version(db, "blog", *(f"blog:{post_id}" for post_id in request.ids))
+    await db.commit()
+    if result.rowcount:
+        cache_versions.expire()
+        prerenderer.posts_changed(*request.ids)
+    return BulkResult(affected=result.rowcount)
+
+@api_router.get("/blog/search", response_model=List[BlogSearchResult])
+async def search_blog(
+    q: str = Query(..., min_length=1, max_length=200),
+    lang: Optional[LanguageCode] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_database)
+):
+    """Full-text search over published posts, best matches first.
+
+    Without `lang`, every language is searched and each post's best hit is kept.
+    """
+    if lang:
+        return await search_blog_posts(db, q, lang.value, limit)
+    return await search_all_languages(db, q, limit)
+
+@api_router.get("/blog/export", dependencies=[Depends(require_admin)])
+async def export_blog_posts(
+    filters: BlogFilter = Depends(),
+    lang: Optional[LanguageCode] = None,
+    format: ExportFormat = ExportFormat.NDJSON,
+    compress: bool = False
+):
+    """Stream matching posts, oldest first, as NDJSON or CSV (admin only).
+
+    Every language's title/content by default, or only `lang`'s.
+    """
+    query = select(*localized_blog_columns(lang)) if lang else blog_query(BlogPostDB.created_at, BlogPostDB.id)
+    query = (
+        query
+        .where(*filters.conditions())
+        .order_by(BlogPostDB.created_at, BlogPostDB.id)
+    )
+    return export_response(ReadSessionLocal, query, format, f"blog-{lang.value}" if lang else "blog", compress)
+
+@api_router.get("/blog/by-slug/{slug}", response_model=Union[BlogPostLocalized, BlogPost])
+async def get_blog_post_by_slug(
+    request: Request,
+    slug: str,
+    lang: Optional[LanguageCode] = None,
+    published_only: bool = True,
+    db: AsyncSession = Depends(get_read_database),
+    admin: Optional[dict] = Depends(optional_admin)
+):
+    """Get a specific blog post by slug, optionally projected to a single language"""
+    require_admin_for_drafts(published_only, admin)
+    if published_only:
+        return await response_cache.get_or_build(
+            request, db, ["blog"], lambda: build_blog_post_by_slug(request, slug, lang, published_only, db)
+        )
+    return await build_blog_post_by_slug(request, slug, lang, published_only, db)
+
+async def build_blog_post_by_slug(
+    request: Request, slug: str, lang: Optional[LanguageCode], published_only: bool, db: AsyncSession
+) -> Response:
+    if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+        validator = select(BlogPostDB.id, BlogPostDB.updated_at).where(BlogPostDB.slug == slug)
+        if published_only:
+            validator = validator.where(BlogPostDB.published == True)
+        row = (await db.execute(validator)).one_or_none()
+        if row:
+            etag = make_etag(row.id, row.updated_at, lang)
+            if is_not_modified(request, etag, row.updated_at):
+                return not_modified_response(etag, row.updated_at)
+
+    if lang:
+        query = select(*localized_blog_columns(lang))
+    else:
+        query = blog_query()
+    query = query.where(BlogPostDB.slug == slug)
+    if published_only:
+        query = query.where(BlogPostDB.published == True)
+
+    row = (await db.execute(query)).one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Blog post not found")
+    post = row_to_localized_blog(row, lang) if lang else db_to_pydantic_blog(row)
+    return model_response(post, validator_headers(make_etag(row.id, row.updated_at, lang), row.updated_at))
 
 @api_router.get("/blog/{post_id}", response_model=BlogPost)
-async def get_blog_post(post_id: str, db: AsyncSession = Depends(get_database)):
+async def get_blog_post(
+    request: Request,
+    post_id: str,
+    db: AsyncSession = Depends(get_read_database)
+):
     """Get a specific blog post"""
-    result = await db.execute(select(BlogPostDB).where(BlogPostDB.id == post_id))
-    post = result.scalar_one_or_none()
+    return await response_cache.get_or_build(
+        request, db, [f"blog:{post_id}"], lambda: build_blog_post(request, post_id, db)
+    )
+
+async def build_blog_post(request: Request, post_id: str, db: AsyncSession) -> Response:
+    if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+        result = await db.execute(select(BlogPostDB.updated_at).where(BlogPostDB.id == post_id))
+        updated_at = result.scalar_one_or_none()
+        if updated_at:
+            etag = make_etag(post_id, updated_at)
+            if is_not_modified(request, etag, updated_at):
+                return not_modified_response(etag, updated_at)
+
+    result = await db.execute(blog_query().where(BlogPostDB.id == post_id))
+    post = result.one_or_none()
     if not post:
         raise HTTPException(status_code=404, detail="Blog post not found")
-    return db_to_pydantic_blog(post)
+    headers = validator_headers(make_etag(post.id, post.updated_at), post.updated_at)
+    return model_response(db_to_pydantic_blog(post), headers)
 
-@api_router.put("/blog/{post_id}", response_model=BlogPost)
+@api_router.put("/blog/{post_id}", response_model=BlogPost, dependencies=[Depends(require_admin)])
 async def update_blog_post(post_id: str, post_data: BlogPostCreate, db: AsyncSession = Depends(get_database)):
     """Update a blog post"""
+    now = datetime.now(timezone.utc)
     result = await db.execute(
         update(BlogPostDB)
         .where(BlogPostDB.id == post_id)
         .values(
-            title_tr=post_data.title_tr,
-            title_en=post_data.title_en,
-            title_de=post_data.title_de,
-            title_ru=post_data.title_ru,
-            content_tr=post_data.content_tr,
-            content_en=post_data.content_en,
-            content_de=post_data.content_de,
-            content_ru=post_data.content_ru,
             slug=post_data.slug,
             published=post_data.published,
-            updated_at=datetime.now(timezone.utc)
+            updated_at=now
         )
+        .returning(BlogPostDB.created_at)
     )
-    await db.commit()
-    
-    if result.rowcount == 0:
+    created_at = result.scalar_one_or_none()
+    if created_at is None:
         raise HTTPException(status_code=404, detail="Blog post not found")
+    await save_translations(db, post_id, BLOG_TRANSLATED_FIELDS, post_data)
+    await index_blog_post(db, post_id, post_data)
+    await bump_cache_version(db, "blog", f"blog:{post_id}")
+    await db.commit()
+    cache_versions.expire()
+    prerenderer.posts_changed(post_id)
     
-    result = await db.execute(select(BlogPostDB).where(BlogPostDB.id == post_id))
-    updated_post = result.scalar_one()
-    return db_to_pydantic_blog(updated_post)
+    # Built from what was written; reading it back would take the write lock again
+    return BlogPost(id=post_id, created_at=created_at, updated_at=now, **post_data.model_dump())
 
-@api_router.delete("/blog/{post_id}")
+@api_router.delete("/blog/{post_id}", dependencies=[Depends(require_admin)])
 async def delete_blog_post(post_id: str, db: AsyncSession = Depends(get_database)):
     """Delete a blog post"""
     result = await db.execute(delete(BlogPostDB).where(BlogPostDB.id == post_id))
-    await db.commit()
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Blog post not found")
+    await delete_translations(db, [post_id])
+    await unindex_blog_post(db, post_id)
+    await bump_cache_version(db, "blog", f"blog:{post_id}")
+    await db.commit()
+    cache_versions.expire()
+    prerenderer.posts_changed(post_id)
     return {"message": "Blog post deleted successfully"}
 
 # Site Settings
-@api_router.get("/settings", response_model=SiteSettings)
-async def get_site_settings(db: AsyncSession = Depends(get_database)):
-    """Get site settings"""
-    result = await db.execute(select(SiteSettingsDB))
-    settings = result.scalar_one_or_none()
+DEFAULT_SITE_TEXTS = SiteSettingsUpdate(
+    hero_title_tr="Av. Deniz Hançer",
+    hero_title_en="Atty. Deniz Hançer",
+    hero_title_de="RA Deniz Hançer",
+    hero_title_ru="Адв. Дениз Ханчер",
+    hero_subtitle_tr="Güvenilir Hukuki Danışmanlık",
+    hero_subtitle_en="Reliable Legal Consulting",
+    hero_subtitle_de="Zuverlässige Rechtsberatung",
+    hero_subtitle_ru="Надежная юридическая консультация",
+    hero_description_tr="Yıllarca deneyim ile müvekkillerimize en kaliteli hukuki hizmetleri sunuyoruz. Uzman ekibimiz ile her türlü hukuki meselenizde yanınızdayız.",
+    hero_description_en="We provide the highest quality legal services to our clients with years of experience. We are here for all your legal matters with our expert team.",
+    hero_description_de="Wir bieten unseren Mandanten mit jahrelanger Erfahrung hochwertige Rechtsdienstleistungen. Wir stehen Ihnen mit unserem Expertenteam bei allen rechtlichen Angelegenheiten zur Seite.",
+    hero_description_ru="Мы предоставляем нашим клиентам высококачественные юридические услуги с многолетним опытом. Мы готовы помочь вам по всем правовым вопросам с нашей командой экспертов.",
+    about_company_tr="DH Hukuk Bürosu, Avukat Deniz HANÇER tarafından kurulmuş olup, İstanbul'da hizmet vermektedir. Yerli müvekkillerin yanı sıra, yabancı müvekkillere de hizmet vermekte olan ofisimiz; güven, gizlilik ve şeffaf çalışma esaslarına özen göstermektedir.",
+    about_company_en="DH Law Office was established by Attorney Deniz HANÇER and serves in Istanbul. Our office, which serves foreign clients as well as local clients; pays attention to the principles of trust, confidentiality and transparent working.",
+    about_company_de="Die DH-Anwaltskanzlei wurde von Rechtsanwalt Deniz HANÇER gegründet und ist in Istanbul tätig. Unser Büro, das neben lokalen auch ausländische Mandanten betreut, achtet auf die Grundsätze von Vertrauen, Vertraulichkeit und transparenter Arbeitsweise.",
+    about_company_ru="Юридическое бюро DH было создано адвокатом Дениз ХАНЧЕР и работает в Стамбуле. Наш офис, который обслуживает как местных, так и иностранных клиентов, уделяет внимание принципам доверия, конфиденциальности и прозрачной работы.",
+    about_founder_tr="Deniz HANÇER, hukuk fakültesini onur öğrencisi olarak, 3 senede bitirmiş olup; halen İstanbul Üniversitesi Ticaret Hukuku dalında yüksek lisans çalışmalarına devam etmektedir.",
+    about_founder_en="Deniz HANÇER graduated from law school as an honor student in 3 years and is currently continuing his graduate studies in Commercial Law at Istanbul University.",
+    about_founder_de="Deniz HANÇER absolvierte die juristische Fakultät als Ehrenstudent in 3 Jahren und setzt derzeit seine Graduiertenstudien im Handelsrecht an der Universität Istanbul fort.",
+    about_founder_ru="Дениз ХАНЧЕР окончил юридический факультет как студент с отличием за 3 года и в настоящее время продолжает аспирантуру по коммерческому праву в Стамбульском университете."
+)
+
+async def load_site_settings(
+    db: AsyncSession, lang: Optional[LanguageCode] = None
+) -> Union[SiteSettings, SiteSettingsLocalized]:
+    """Load site settings (only one language's texts with `lang`), creating the defaults on first use"""
+    row = (await db.execute(settings_query(lang))).one_or_none()
     
-    if not settings:
-        # Create default settings if none exist
-        settings_id = str(uuid.uuid4())
-        default_settings = SiteSettingsDB(
-            id=settings_id,
-            logo_url="",
-            hero_title_tr="Av. Deniz Hançer",
-            hero_title_en="Atty. Deniz Hançer", 
-            hero_title_de="RA Deniz Hançer",
-            hero_title_ru="Адв. Дениз Ханчер",
-            hero_subtitle_tr="Güvenilir Hukuki Danışmanlık",
-            hero_subtitle_en="Reliable Legal Consulting",
-            hero_subtitle_de="Zuverlässige Rechtsberatung", 
-            hero_subtitle_ru="Надежная юридическая консультация",
-            hero_description_tr="Yıllarca deneyim ile müvekkillerimize en kaliteli hukuki hizmetleri sunuyoruz. Uzman ekibimiz ile her türlü hukuki meselenizde yanınızdayız.",
-            hero_description_en="We provide the highest quality legal services to our clients with years of experience. We are here for all your legal matters with our expert team.",
-            hero_description_de="Wir bieten unseren Mandanten mit jahrelanger Erfahrung hochwertige Rechtsdienstleistungen. Wir stehen Ihnen mit unserem Expertenteam bei allen rechtlichen Angelegenheiten zur Seite.",
-            hero_description_ru="Мы предоставляем нашим клиентам высококачественные юридические услуги с многолетним опытом. Мы готовы помочь вам по всем правовым вопросам с нашей командой экспертов.",
-            about_company_tr="DH Hukuk Bürosu, Avukat Deniz HANÇER tarafından kurulmuş olup, İstanbul'da hizmet vermektedir. Yerli müvekkillerin yanı sıra, yabancı müvekkillere de hizmet vermekte olan ofisimiz; güven, gizlilik ve şeffaf çalışma esaslarına özen göstermektedir.",
-            about_company_en="DH Law Office was established by Attorney Deniz HANÇER and serves in Istanbul. Our office, which serves foreign clients as well as local clients; pays attention to the principles of trust, confidentiality and transparent working.",
-            about_company_de="Die DH-Anwaltskanzlei wurde von Rechtsanwalt Deniz HANÇER gegründet und ist in Istanbul tätig. Unser Büro, das neben lokalen auch ausländische Mandanten betreut, achtet auf die Grundsätze von Vertrauen, Vertraulichkeit und transparenter Arbeitsweise.",
-            about_company_ru="Юридическое бюро DH было создано адвокатом Дениз ХАНЧЕР и работает в Стамбуле. Наш офис, который обслуживает как местных, так и иностранных клиентов, уделяет внимание принципам доверия, конфиденциальности и прозрачной работы.",
-            about_founder_tr="Deniz HANÇER, hukuk fakültesini onur öğrencisi olarak, 3 senede bitirmiş olup; halen İstanbul Üniversitesi Ticaret Hukuku dalında yüksek lisans çalışmalarına devam etmektedir.",
-            about_founder_en="Deniz HANÇER graduated from law school as an honor student in 3 years and is currently continuing his graduate studies in Commercial Law at Istanbul University.",
-            about_founder_de="Deniz HANÇER absolvierte die juristische Fakultät als Ehrenstudent in 3 Jahren und setzt derzeit seine Graduiertenstudien im Handelsrecht an der Universität Istanbul fort.",
-            about_founder_ru="Дениз ХАНЧЕР окончил юридический факультет как студент с отличием за 3 года и в настоящее время продолжает аспирантуру по коммерческому праву в Стамбульском университете.",
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
-        db.add(default_settings)
-        await db.commit()
-        await db.refresh(default_settings)
-        return db_to_pydantic_settings(default_settings)
+    if not row:
+        # Create default settings if none exist (db may be a read-only session)
+        async with SessionLocal() as write_db:
+            if (await write_db.execute(select(SiteSettingsDB.id))).first() is None:
+                settings_id = str(uuid.uuid4())
+                now = datetime.now(timezone.utc)
+                write_db.add(SiteSettingsDB(id=settings_id, logo_url="", created_at=now, updated_at=now))
+                await save_translations(write_db, settings_id, SETTINGS_TRANSLATED_FIELDS, DEFAULT_SITE_TEXTS)
+                await write_db.commit()
+            row = (await write_db.execute(settings_query(lang))).one()
     
-    return db_to_pydantic_settings(settings)
+    if lang:
+        return SiteSettingsLocalized(**{**row._mapping, "lang": lang, "logo_url": row.logo_url or ""})
+    return db_to_pydantic_settings(row)
+
+# Per-language HTML snapshots of the landing page and published posts, served
+# by serve_frontend and regenerated in the background after blog/settings changes
+PRERENDER_DIR = Path(os.environ.get("PRERENDER_DIR", ROOT_DIR / "prerendered"))
+prerenderer = Prerenderer(FRONTEND_BUILD_DIR / "index.html", PRERENDER_DIR, ReadSessionLocal, load_site_settings)
 
-@api_router.put("/settings", response_model=SiteSettings)
+@api_router.get("/settings", response_model=Union[SiteSettingsLocalized, SiteSettings])
+async def get_site_settings(
+    request: Request,
+    lang: Optional[LanguageCode] = None,
+    db: AsyncSession = Depends(get_read_database)
+):
+    """Get site settings, optionally with only one language's texts"""
+    async def build() -> Response:
+        settings = await load_site_settings(db, lang)
+        body = settings.model_dump_json().encode()
+        headers = validator_headers(body_etag(body), settings.updated_at)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    return await response_cache.get_or_build(request, db, ["settings"], build)
+
+@api_router.put("/settings", response_model=SiteSettings, dependencies=[Depends(require_admin)])
 async def update_site_settings(settings_data: SiteSettingsUpdate, db: AsyncSession = Depends(get_database)):
     """Update site settings"""
-    result = await db.execute(select(SiteSettingsDB))
-    existing_settings = result.scalar_one_or_none()
+    result = await db.execute(select(SiteSettingsDB.id, SiteSettingsDB.created_at))
+    settings_id, created_at = result.one_or_none() or (None, None)
+    now = datetime.now(timezone.utc)
     
-    if existing_settings:
+    if settings_id:
         # Update existing settings
         await db.execute(
             update(SiteSettingsDB)
-            .where(SiteSettingsDB.id == existing_settings.id)
-            .values(
-                logo_url=settings_data.logo_url,
-                hero_title_tr=settings_data.hero_title_tr,
-                hero_title_en=settings_data.hero_title_en,
-                hero_title_de=settings_data.hero_title_de,
-                hero_title_ru=settings_data.hero_title_ru,
-                hero_subtitle_tr=settings_data.hero_subtitle_tr,
-                hero_subtitle_en=settings_data.hero_subtitle_en,
-                hero_subtitle_de=settings_data.hero_subtitle_de,
-                hero_subtitle_ru=settings_data.hero_subtitle_ru,
-                hero_description_tr=settings_data.hero_description_tr,
-                hero_description_en=settings_data.hero_description_en,
-                hero_description_de=settings_data.hero_description_de,
-                hero_description_ru=settings_data.hero_description_ru,
-                about_company_tr=settings_data.about_company_tr,
-                about_company_en=settings_data.about_company_en,
-                about_company_de=settings_data.about_company_de,
-                about_company_ru=settings_data.about_company_ru,
-                about_founder_tr=settings_data.about_founder_tr,
-                about_founder_en=settings_data.about_founder_en,
-                about_founder_de=settings_data.about_founder_de,
-                about_founder_ru=settings_data.about_founder_ru,
-                updated_at=datetime.now(timezone.utc)
-            )
+            .where(SiteSettingsDB.id == settings_id)
+            .values(logo_url=settings_data.logo_url, updated_at=now)
         )
     else:
         # Create new settings
         settings_id = str(uuid.uuid4())
-        new_settings = SiteSettingsDB(
-            id=settings_id,
-            **settings_data.dict(),
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
-        db.add(new_settings)
+        created_at = now
+        db.add(SiteSettingsDB(id=settings_id, logo_url=settings_data.logo_url, created_at=now, updated_at=now))
+    await save_translations(db, settings_id, SETTINGS_TRANSLATED_FIELDS, settings_data)
     
+    await bump_cache_version(db, "settings")
     await db.commit()
+    cache_versions.expire()
+    prerenderer.landing_changed()
     
-    # Return updated settings
-    result = await db.execute(select(SiteSettingsDB))
-    updated_settings = result.scalar_one()
-    return db_to_pydantic_settings(updated_settings)
+    # Return updated settings, built from what was written
+    return SiteSettings(id=settings_id, created_at=created_at, updated_at=now, **settings_data.model_dump())
 
 # Admin routes
 @api_router.get("/admin/check-setup")
-async def check_admin_setup(db: AsyncSession = Depends(get_database)):
+async def check_admin_setup(db: AsyncSession = Depends(get_read_database)):
     """Check if admin user exists"""
     result = await db.execute(select(AdminUserDB))
     admin = result.scalar_one_or_none()
     return {"has_admin": admin is not None}
 
-@api_router.delete("/admin/reset")
+@api_router.delete("/admin/reset", dependencies=[Depends(require_admin)])
 async def reset_admin(db: AsyncSession = Depends(get_database)):
     """Reset admin users - for development only"""
     await db.execute(delete(AdminUserDB))
@@ -503,75 +1013,107 @@ async def reset_admin(db: AsyncSession = Depends(get_database)):
     return {"message": "Admin users reset successfully"}
 
 @api_router.post("/admin/setup")
-async def setup_admin(request: AdminSetupRequest, db: AsyncSession = Depends(get_database)):
+async def setup_admin(request: AdminSetupRequest, db: AsyncSession = Depends(get_read_database)):
     """Setup initial admin user"""
     # Check if admin already exists
-    result = await db.execute(select(AdminUserDB))
-    existing_admin = result.scalar_one_or_none()
-    if existing_admin:
+    result = await db.execute(select(AdminUserDB.id).limit(1))
+    if result.first():
         raise HTTPException(status_code=400, detail="Admin user already exists")
     
-    # Simple password hashing
-    password_hash = hashlib.sha256(request.password.encode()).hexdigest()
+    # Hashing happens outside the write transaction
+    password_hash = await hash_password(request.password)
     
-    admin_id = str(uuid.uuid4())
-    admin_user = AdminUserDB(
-        id=admin_id,
-        username=request.username,
-        password_hash=password_hash,
-        created_at=datetime.now(timezone.utc),
-        is_active=True
-    )
-    db.add(admin_user)
-    await db.commit()
+    async with SessionLocal() as write_db:
+        # Checked again under the write lock, in case another setup won the race
+        if (await write_db.execute(select(AdminUserDB.id).limit(1))).first():
+            raise HTTPException(status_code=400, detail="Admin user already exists")
+        admin_user = AdminUserDB(
+            id=str(uuid.uuid4()),
+            username=request.username,
+            password_hash=password_hash,
+            created_at=datetime.now(timezone.utc),
+            is_active=True
+        )
+        write_db.add(admin_user)
+        await write_db.commit()
     
     return {"message": "Admin user created successfully"}
 
 @api_router.post("/admin/login")
-async def admin_login(request: AdminLoginRequest, db: AsyncSession = Depends(get_database)):
-    """Admin login"""
-    password_hash = hashlib.sha256(request.password.encode()).hexdigest()
-    
+async def admin_login(request: AdminLoginRequest, db: AsyncSession = Depends(get_read_database)):
+    """Admin login, returns a bearer token for the admin endpoints"""
     result = await db.execute(
-        select(AdminUserDB).where(
+        select(AdminUserDB.id, AdminUserDB.password_hash, AdminUserDB.token_version).where(
             AdminUserDB.username == request.username,
-            AdminUserDB.password_hash == password_hash,
             AdminUserDB.is_active == True
         )
     )
-    admin = result.scalar_one_or_none()
+    admin = result.first()
     
-    if not admin:
+    # Unknown users cost the same hashing time as a wrong password
+    if not await verify_password(request.password, admin.password_hash if admin else None):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    return {"message": "Login successful", "admin_id": admin.id}
+    # Upgrade legacy SHA-256 hashes (or weaker scrypt parameters) in place
+    if needs_rehash(admin.password_hash):
+        password_hash = await hash_password(request.password)
+        async with SessionLocal() as write_db:
+            await write_db.execute(
+                update(AdminUserDB)
+                .where(AdminUserDB.id == admin.id, AdminUserDB.password_hash == admin.password_hash)
+                .values(password_hash=password_hash)
+            )
+            await write_db.commit()
+    
+    token, expires_at = create_session_token(admin.id, admin.token_version)
+    return {
+        "message": "Login successful",
+        "admin_id": admin.id,
+        "token": token,
+        "token_type": "bearer",
+        "expires_at": expires_at
+    }
 
 @api_router.post("/admin/change-password")
-async def change_admin_password(request: PasswordChangeRequest, db: AsyncSession = Depends(get_database)):
-    """Change admin password"""
-    current_password_hash = hashlib.sha256(request.current_password.encode()).hexdigest()
-    
+async def change_admin_password(
+    request: PasswordChangeRequest,
+    db: AsyncSession = Depends(get_read_database),
+    admin: dict = Depends(require_admin)
+):
+    """Change the signed-in admin's password, signing out every other session"""
     result = await db.execute(
-        select(AdminUserDB).where(
-            AdminUserDB.password_hash == current_password_hash,
+        select(AdminUserDB.password_hash).where(
+            AdminUserDB.id == admin["sub"],
             AdminUserDB.is_active == True
         )
     )
-    admin = result.scalar_one_or_none()
+    current_hash = result.scalar_one_or_none()
     
-    if not admin:
-        raise HTTPException(status_code=401, detail="Current password is incorrect")
+    if not await verify_password(request.current_password, current_hash):
+        # 400 rather than 401: the session itself is valid
+        raise HTTPException(status_code=400, detail="Current password is incorrect")
     
-    new_password_hash = hashlib.sha256(request.new_password.encode()).hexdigest()
+    new_password_hash = await hash_password(request.new_password)
     
-    await db.execute(
-        update(AdminUserDB)
-        .where(AdminUserDB.id == admin.id)
-        .values(password_hash=new_password_hash)
-    )
-    await db.commit()
+    # Hashing happens outside the write transaction
+    async with SessionLocal() as write_db:
+        result = await write_db.execute(
+            update(AdminUserDB)
+            .where(AdminUserDB.id == admin["sub"])
+            .values(password_hash=new_password_hash, token_version=AdminUserDB.token_version + 1)
+            .returning(AdminUserDB.token_version)
+        )
+        token_version = result.scalar_one()
+        await write_db.commit()
     
-    return {"message": "Password changed successfully"}
+    # The bump revoked the caller's token too; hand out a fresh one
+    token, expires_at = create_session_token(admin["sub"], token_version)
+    return {
+        "message": "Password changed successfully",
+        "token": token,
+        "token_type": "bearer",
+        "expires_at": expires_at
+    }
 
 @api_router.post("/admin/forgot-password")
 async def forgot_password(request: PasswordResetRequest, db: AsyncSession = Depends(get_database)):
@@ -584,8 +1126,10 @@ async def forgot_password(request: PasswordResetRequest, db: AsyncSession = Depe
     )
     admin = result.scalar_one_or_none()
     
+    # Same answer whether or not the account exists
+    response = {"message": "If an account with this email exists, a reset link has been sent"}
     if not admin:
-        return {"message": "If an account with this email exists, a reset link has been sent"}
+        return response
     
     # Generate reset token
     reset_token = str(uuid.uuid4())
@@ -599,102 +1143,154 @@ async def forgot_password(request: PasswordResetRequest, db: AsyncSession = Depe
         used=False
     )
     db.add(reset_record)
+    reset_link = f"{PUBLIC_BASE_URL}/admin/reset-password?token={reset_token}"
+    if notification_worker.enabled:
+        enqueue_notification(
+            db,
+            "password_reset",
+            admin.username,
+            "Password reset",
+            f"Use this link within one hour to reset your admin password:\n\n{reset_link}",
+        )
     await db.commit()
     
-    # Return reset link for demo
-    reset_link = f"https://hancer-attorney.preview.emergentagent.com/admin/reset-password?token={reset_token}"
-    
-    return {"message": "Reset link sent", "reset_link": reset_link}
+    if notification_worker.enabled:
+        notification_worker.wake()
+    elif RESET_LINK_IN_RESPONSE:
+        response["reset_link"] = reset_link
+    else:
+        logger.warning("Password reset requested but no NOTIFY_TRANSPORT is configured to deliver it")
+    return response
 
 @api_router.post("/admin/reset-password")
-async def reset_password(token: str, new_password: str, db: AsyncSession = Depends(get_database)):
+async def reset_password(token: str, new_password: str, db: AsyncSession = Depends(get_read_database)):
     """Reset password with token"""
     result = await db.execute(
-        select(PasswordResetDB).where(
+        select(PasswordResetDB.id, PasswordResetDB.admin_id, PasswordResetDB.expires_at).where(
             PasswordResetDB.token == token,
             PasswordResetDB.used == False
         )
     )
-    reset_record = result.scalar_one_or_none()
+    reset_record = result.first()
     
     if not reset_record:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
     
     # Check if token is expired
-    if datetime.now(timezone.utc) > reset_record.expires_at:
+    if naive_utc(datetime.now(timezone.utc)) > naive_utc(reset_record.expires_at):
         raise HTTPException(status_code=400, detail="Reset token has expired")
     
-    # Update password
-    new_password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+    # Hashing happens outside the write transaction
+    new_password_hash = await hash_password(new_password)
     
-    await db.execute(
-        update(AdminUserDB)
-        .where(AdminUserDB.id == reset_record.admin_id)
-        .values(password_hash=new_password_hash)
-    )
-    
-    # Mark token as used
-    await db.execute(
-        update(PasswordResetDB)
-        .where(PasswordResetDB.id == reset_record.id)
-        .values(used=True)
-    )
-    await db.commit()
+    async with SessionLocal() as write_db:
+        # Mark token as used; only one of several concurrent resets gets it
+        result = await write_db.execute(
+            update(PasswordResetDB)
+            .where(PasswordResetDB.id == reset_record.id, PasswordResetDB.used == False)
+            .values(used=True)
+        )
+        if result.rowcount == 0:
+            raise HTTPException(status_code=400, detail="Invalid or expired reset token")
+        
+        # Update password and sign out every existing session
+        await write_db.execute(
+            update(AdminUserDB)
+            .where(AdminUserDB.id == reset_record.admin_id)
+            .values(password_hash=new_password_hash, token_version=AdminUserDB.token_version + 1)
+        )
+        await write_db.commit()
     
     return {"message": "Password reset successfully"}
 
+# Profiling
+class ProfileFormat(str, Enum):
+    PROF = "prof"
+    TEXT = "text"
+
+@api_router.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def get_profiles():
+    """Stored request profiles, newest first (admin only)"""
+    return await asyncio.to_thread(list_profiles)
+
+@api_router.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(
+    profile_id: str,
+    format: ProfileFormat = ProfileFormat.PROF,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$")
+):
+    """Download a profile as a pstats dump, or as a text report of the top functions"""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == ProfileFormat.TEXT:
+        return PlainTextResponse(await asyncio.to_thread(profile_summary, path, sort))
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
 # File Upload
-@api_router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    """Upload image file"""
-    # Check file type
-    allowed_extensions = {'.jpg', '.jpeg', '.png', '.webp', '.svg'}
-    file_extension = Path(file.filename).suffix.lower()
-    
-    if file_extension not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Invalid file type. Only JPG, PNG, WebP, SVG allowed.")
-    
-    # Generate unique filename
-    file_id = str(uuid.uuid4())
-    filename = f"{file_id}{file_extension}"
-    file_path = ROOT_DIR / "uploads" / filename
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+UPLOADS_DIR = ROOT_DIR / "uploads"
+# Resized copies live in a subdirectory so they stay out of the logo picker
+UPLOAD_VARIANTS_DIR = UPLOADS_DIR / "variants"
+# Partial uploads are written next to, not inside, the served directory
+UPLOAD_TMP_DIR = ROOT_DIR / "upload-tmp"
+upload_index = UploadIndex(UPLOADS_DIR, "/uploads")
+
+# The body is streamed by receive_image_upload, so it is described here for the docs
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }
+        }
+    },
+}
+
+@api_router.post(
+    "/upload", openapi_extra={"requestBody": UPLOAD_REQUEST_BODY}, dependencies=[Depends(require_admin)]
+)
+async def upload_file(request: Request):
+    """Upload image file and build its responsive variants"""
+    # Streamed to a temp file, size-capped, type checked by magic bytes
+    file_path = await receive_image_upload(request, UPLOADS_DIR, UPLOAD_TMP_DIR)
+    upload_index.add(file_path)
     
-    # Return URL
-    file_url = f"/uploads/{filename}"
-    return {"url": file_url}
+    # Return URL plus the srcset manifest (None for SVG)
+    file_url = f"/uploads/{file_path.name}"
+    image = await process_upload(file_path, UPLOAD_VARIANTS_DIR, "/uploads")
+    return {"url": file_url, "image": image}
 
 # Logo Management
-@api_router.get("/logos")
-async def get_available_logos():
-    """Get list of available logos from uploads directory"""
-    uploads_dir = ROOT_DIR / "uploads"
-    
-    if not uploads_dir.exists():
-        return {"logos": []}
-    
-    allowed_extensions = {'.jpg', '.jpeg', '.png', '.webp', '.svg'}
-    logo_files = []
-    
-    for file_path in uploads_dir.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() in allowed_extensions:
-            logo_files.append({
-                "filename": file_path.name,
-                "url": f"/uploads/{file_path.name}",
-                "display_name": file_path.stem.replace("_", " ").title()
-            })
-    
-    # Sort by filename for consistent ordering
-    logo_files.sort(key=lambda x: x["filename"])
-    
-    return {"logos": logo_files}
+@api_router.get("/logos", dependencies=[Depends(require_admin)])
+async def get_available_logos(
+    kind: Optional[UploadKind] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500)
+):
+    """Get list of available logos from the uploads index"""
+    logo_files, total = await upload_index.list(kind.value if kind else None, offset, limit)
+    return {"logos": logo_files, "total": total}
 
 # API router - mount before catch-all
 app.include_router(api_router)
 
+# Prometheus scrape endpoint; set METRICS_TOKEN to require a bearer token
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+metrics_store = MetricsStore()
+
+@app.get("/api/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Request and query metrics of all workers in Prometheus text format"""
+    if METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"
+    ):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    merged = await metrics_store.collect()
+    return Response(content=render_prometheus(merged), media_type="text/plain; version=0.0.4")
+
 # Health check API endpoint
 @app.get("/api/health")
 async def health_check():
@@ -702,24 +1298,46 @@ async def health_check():
 
 # Serve frontend - catch all routes for SPA
 @app.get("/{full_path:path}")
-async def serve_frontend(full_path: str):
+async def serve_frontend(request: Request, full_path: str):
     """Serve the React frontend for all non-API routes"""
-    frontend_build = ROOT_DIR.parent / "frontend" / "build"
-    
     # If requesting a specific file, try to serve it
     if full_path and not full_path.startswith("api/"):
-        file_path = frontend_build / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
+        entry = frontend_manifest.get(full_path)
+        if entry:
+            return frontend_manifest.response(request, entry)
+        if full_path.startswith("static/"):
+            raise HTTPException(status_code=404, detail="Not found")
+    
+    # Landing page and blog posts: a pre-rendered snapshot in the visitor's language
+    snapshot = await prerenderer.response(request, full_path)
+    if snapshot is not None:
+        return snapshot
     
     # Otherwise serve index.html (for SPA routing)
-    index_file = frontend_build / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
+    index_entry = frontend_manifest.get("index.html")
+    if index_entry:
+        return frontend_manifest.response(request, index_entry)
     
     # Fallback if frontend not built
     return {"message": "Frontend not found. Please build the frontend first."}
 
+# Innermost, so a profile covers the endpoint rather than the middleware stack
+app.add_middleware(ProfilerMiddleware)
+
+# Public endpoints that cost a DB write or a password hash. Added before CORS
+# so that rejections still carry CORS headers.
+app.add_middleware(
+    RateLimitMiddleware,
+    rules=[
+        RateLimitRule.from_env("messages", "POST", "/api/messages", per_minute=5, burst=10, max_concurrency=16),
+        RateLimitRule.from_env("login", "POST", "/api/admin/login", per_minute=10, burst=5, max_concurrency=4),
+        RateLimitRule.from_env(
+            "password_reset", "POST", "/api/admin/forgot-password", per_minute=2, burst=3, max_concurrency=4
+        ),
+    ],
+    buckets=SharedBuckets(engine) if RATE_LIMIT_SHARED else LocalBuckets(),
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -746,15 +1364,26 @@ app.add_middleware(
         "Cache-Control",
         "X-Mx-ReqToken",
         "Keep-Alive",
-        "If-Modified-Since"
+        "If-Modified-Since",
+        "If-None-Match",
+        "Last-Event-ID",
+        "X-Profile"
     ],
     expose_headers=[
+        "ETag",
+        "Last-Modified",
+        "X-Next-Cursor",
+        "X-Last-Event-Id",
+        "X-Profile-Id",
         "Content-Length",
         "Content-Range", 
         "X-Content-Range"
     ]
 )
 
+# Outermost, so rejected and CORS-only responses are measured too
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -767,9 +1396,25 @@ logger = logging.getLogger(__name__)
 async def startup_event():
     await create_tables()
     logger.info("Database tables created successfully")
+    await asyncio.to_thread(frontend_manifest.build)
+    await upload_index.refresh(force=True)
+    if MESSAGE_WRITE_BEHIND:
+        await message_queue.start()
+    notification_worker.start()
+    metrics_store.start()
+    prerenderer.start()
+    message_events.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await message_queue.stop()
+    await notification_worker.stop()
+    await metrics_store.stop()
+    await prerenderer.stop()
+    await message_events.stop()
+    shutdown_pool()
+    # Last, after the write-behind queue and background tasks have flushed
+    await close_database()
     logger.info("Application shutting down")
 
 # Main function for running the server directly
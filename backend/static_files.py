@@ -0,0 +1,145 @@
+import gzip
+import logging
+import mimetypes
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from http_cache import accepts_encoding, http_date, is_not_modified
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Hashed build output (CRA puts content hashes in every file name under static/)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# index.html, config.js, manifest.json... can change without their name changing
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+    "text/javascript",
+}
+COMPRESS_MIN_BYTES = 1024
+# Small files (the SPA shell, config.js...) are kept in memory
+INLINE_MAX_BYTES = 64 * 1024
+
+ENCODING_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+class StaticVariant:
+    """One on-disk representation of a file (identity, br or gzip)"""
+
+    def __init__(self, path: Path, stat_result: os.stat_result):
+        self.path = path
+        self.stat_result = stat_result
+        self.body = path.read_bytes() if stat_result.st_size <= INLINE_MAX_BYTES else None
+
+class StaticEntry:
+    def __init__(self, path: Path, relative_path: str, stat_result: os.stat_result):
+        self.media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.cache_control = (
+            IMMUTABLE_CACHE_CONTROL if relative_path.startswith("static/") else REVALIDATE_CACHE_CONTROL
+        )
+        self.etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        self.last_modified = datetime.fromtimestamp(stat_result.st_mtime, timezone.utc)
+        self.variants: Dict[Optional[str], StaticVariant] = {None: StaticVariant(path, stat_result)}
+
+    def pick(self, accept_encoding: str):
+        for encoding, _ in ENCODING_SUFFIXES:
+            if encoding in self.variants and accepts_encoding(accept_encoding, encoding):
+                return encoding, self.variants[encoding]
+        return None, self.variants[None]
+
+class FrontendManifest:
+    """Path -> file index of the frontend build, built once at startup.
+
+    Requests are resolved with a dict lookup; no stat() happens per request.
+    Compressible files get .br/.gz siblings, reusing ones produced by the
+    frontend build when they are at least as new as the original.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.entries: Dict[str, StaticEntry] = {}
+
+    def build(self, precompress: bool = True):
+        entries = {}
+        if self.root.is_dir():
+            for path in self.root.rglob("*"):
+                if not path.is_file() or path.suffix in (".br", ".gz") or path.name.startswith("."):
+                    continue
+                relative_path = path.relative_to(self.root).as_posix()
+                stat_result = path.stat()
+                entry = StaticEntry(path, relative_path, stat_result)
+                if precompress and _is_compressible(entry.media_type) and stat_result.st_size >= COMPRESS_MIN_BYTES:
+                    self._add_compressed_variants(entry, path, stat_result)
+                entries[relative_path] = entry
+        self.entries = entries
+        logger.info(f"Frontend manifest built with {len(entries)} files from {self.root}")
+
+    def _add_compressed_variants(self, entry: StaticEntry, path: Path, stat_result: os.stat_result):
+        data = None
+        for encoding, suffix in ENCODING_SUFFIXES:
+            if encoding == "br" and brotli is None:
+                continue
+            sibling = path.with_name(path.name + suffix)
+            try:
+                sibling_stat = sibling.stat()
+                fresh = sibling_stat.st_mtime_ns >= stat_result.st_mtime_ns
+            except FileNotFoundError:
+                fresh = False
+            if not fresh:
+                if data is None:
+                    data = path.read_bytes()
+                compressed = brotli.compress(data) if encoding == "br" else gzip.compress(data, 9, mtime=0)
+                if len(compressed) >= stat_result.st_size:
+                    continue
+                try:
+                    _write_atomic(sibling, compressed)
+                except OSError as e:
+                    logger.warning(f"Could not write {sibling}: {e}")
+                    continue
+                sibling_stat = sibling.stat()
+            entry.variants[encoding] = StaticVariant(sibling, sibling_stat)
+
+    def get(self, relative_path: str) -> Optional[StaticEntry]:
+        return self.entries.get(relative_path)
+
+    def response(self, request: Request, entry: StaticEntry) -> Response:
+        encoding, variant = entry.pick(request.headers.get("accept-encoding", ""))
+        # Each encoding is a different representation and needs its own validator
+        etag = f'{entry.etag[:-1]}-{encoding}"' if encoding else entry.etag
+        headers = {
+            "Cache-Control": entry.cache_control,
+            "ETag": etag,
+            "Last-Modified": http_date(entry.last_modified),
+        }
+        if len(entry.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if is_not_modified(request, etag, entry.last_modified):
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if variant.body is not None:
+            return Response(content=variant.body, media_type=entry.media_type, headers=headers)
+        return FileResponse(
+            variant.path, media_type=entry.media_type, headers=headers, stat_result=variant.stat_result
+        )
@@ -0,0 +1,70 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import and_, case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import TranslationDB, LANGUAGES
+
+def _value(entity_id_column, field: str, lang: str):
+    return (
+        select(TranslationDB.value)
+        .where(
+            TranslationDB.entity_id == entity_id_column,
+            TranslationDB.lang == lang,
+            TranslationDB.field == field,
+        )
+        .scalar_subquery()
+    )
+
+def translated_columns(entity_id_column, fields: Iterable[str], lang: str,
+                       fallback: Optional[str] = None) -> List:
+    """One language's text as columns of a select on the entity's table.
+
+    One column per field named after the field, reading only that language's
+    rows (and `fallback`'s when empty).
+    """
+    columns = []
+    for field in fields:
+        value = _value(entity_id_column, field, lang)
+        if fallback and fallback != lang:
+            value = func.coalesce(func.nullif(value, ""), _value(entity_id_column, field, fallback))
+        columns.append(func.coalesce(value, "").label(field))
+    return columns
+
+def with_translations(query, entity_id_column, fields: Iterable[str], group_by=()):
+    """Add the wide `<field>_<lang>` columns of every language to `query`.
+
+    This is the shape the API has always returned. It is pivoted from one join
+    on translations, grouped back to a row per entity, rather than from a
+    correlated subquery per column. `group_by` should repeat the query's
+    ORDER BY columns, ending with the entity id, so SQLite groups in index
+    order instead of sorting through a temp B-tree. It defaults to the id alone.
+    """
+    fields = list(fields)
+    columns = [
+        func.coalesce(
+            func.max(case((and_(TranslationDB.field == field, TranslationDB.lang == each), TranslationDB.value))), ""
+        ).label(f"{field}_{each}")
+        for field in fields
+        for each in LANGUAGES
+    ]
+    return (
+        query.add_columns(*columns)
+        .outerjoin(TranslationDB, and_(TranslationDB.entity_id == entity_id_column, TranslationDB.field.in_(fields)))
+        .group_by(*(group_by or (entity_id_column,)))
+    )
+
+async def save_translations(db: AsyncSession, entity_id: str, fields: Iterable[str], source):
+    """Upsert every language of `fields` from an object with `<field>_<lang>` attributes"""
+    rows = [
+        {"entity_id": entity_id, "lang": lang, "field": field, "value": getattr(source, f"{field}_{lang}") or ""}
+        for field in fields
+        for lang in LANGUAGES
+    ]
+    statement = insert(TranslationDB).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[TranslationDB.entity_id, TranslationDB.lang, TranslationDB.field],
+        set_={"value": statement.excluded.value},
+    ))
+
+async def delete_translations(db: AsyncSession, entity_ids: Iterable[str]):
+    await db.execute(delete(TranslationDB).where(TranslationDB.entity_id.in_(list(entity_ids))))
@@ -39,10 +39,19 @@ print_success "Değişiklikler çekildi"
 
 # Container'ı durdur
 print_info "Container durduruluyor..."
-docker stop hancer-backend || true
+# Kapanışta WAL'ın ana dosyaya yazılması için süre tanı
+docker stop -t 40 hancer-backend || true
 docker rm hancer-backend || true
 print_success "Container durduruldu"
 
+# Veritabanı klasörü: hancer_law.db ve -wal/-shm dosyaları birlikte burada durur
+mkdir -p data
+if [ -f hancer_law.db ] && [ ! -f data/hancer_law.db ]; then
+    print_info "hancer_law.db data/ klasörüne taşınıyor..."
+    mv hancer_law.db* data/
+    print_success "Veritabanı data/ klasörüne taşındı"
+fi
+
 # Eski image'ları temizle (opsiyonel)
 print_info "Eski Docker image'ları temizleniyor..."
 docker image prune -f
@@ -60,7 +69,7 @@ docker run -d \
   --restart unless-stopped \
   -p 8000:8000 \
   -v "$(pwd)/uploads:/app/uploads" \
-  -v "$(pwd)/hancer_law.db:/app/hancer_law.db" \
+  -v "$(pwd)/data:/app/data" \
   --env-file .env \
   hancer-backend
 
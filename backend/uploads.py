@@ -0,0 +1,231 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from fastapi import HTTPException, Request
+from images import read_dimensions
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+SNIFF_BYTES = 1024
+
+def sniff_image_extension(head: bytes) -> Optional[str]:
+    """Identify an image by its leading bytes, ignoring the client's filename"""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith((b"<?xml", b"<svg", b"<!--", b"<!doctype svg")) and b"<svg" in text:
+        return ".svg"
+    return None
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413, detail=f"File too large. Maximum size is {round(max_bytes / (1024 * 1024), 1):g} MB."
+    )
+
+class _FilePartWriter:
+    """Collects the bytes of one multipart file field as the parser emits them"""
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_target = False
+        self.found = False
+        self.pending = bytearray()
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self):
+        self.headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self.headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        # Only the first matching part is kept
+        self._in_target = not self.found and name == self.field_name and b"filename" in options
+        if self._in_target:
+            self.found = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_target:
+            self.pending += data[start:end]
+
+    def _on_part_end(self):
+        self._in_target = False
+
+async def receive_image_upload(request: Request, upload_dir: Path, tmp_dir: Path,
+                               field_name: str = "file", max_bytes: int = MAX_UPLOAD_BYTES) -> Path:
+    """Stream a multipart image upload into `upload_dir` and return its final path.
+
+    The body is read chunk by chunk and written from a worker thread to a
+    temp file in `tmp_dir`, aborting with 413 as soon as it exceeds
+    `max_bytes`. `tmp_dir` must be outside the served directory and on the
+    same filesystem. The type is taken from the file's magic bytes, and the
+    file is renamed atomically to `<uuid><ext>` only once it is complete.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise _too_large(max_bytes)
+
+    writer = _FilePartWriter(field_name)
+    parser = MultipartParser(boundary, writer.callbacks())
+    file_id = str(uuid.uuid4())
+    tmp_path = tmp_dir / f"{file_id}.part"
+    await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+    out = await asyncio.to_thread(open, tmp_path, "wb")
+    size = 0
+    head = b""
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Malformed multipart body")
+            if not writer.pending:
+                continue
+            data = bytes(writer.pending)
+            writer.pending.clear()
+            size += len(data)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            if len(head) < SNIFF_BYTES:
+                head += data[:SNIFF_BYTES - len(head)]
+            await asyncio.to_thread(out.write, data)
+        parser.finalize()
+
+        if not writer.found or size == 0:
+            raise HTTPException(status_code=400, detail="No file uploaded")
+        extension = sniff_image_extension(head)
+        if extension is None:
+            raise HTTPException(status_code=400, detail="Invalid file type. Only JPG, PNG, WebP, SVG allowed.")
+
+        await asyncio.to_thread(_flush_and_close, out)
+        final_path = upload_dir / f"{file_id}{extension}"
+        os.replace(tmp_path, final_path)
+        return final_path
+    finally:
+        if not out.closed:
+            await asyncio.to_thread(out.close)
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def _flush_and_close(out):
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+
+# File extension -> kind reported by the upload index
+UPLOAD_KINDS = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png", ".webp": "webp", ".svg": "svg"}
+
+class UploadIndex:
+    """In-memory metadata for the files in the uploads directory.
+
+    Built once at startup and updated by `add` after each upload. Before
+    each read the directory's mtime is compared with the last scan, so
+    files written by other workers (or by hand) show up without a full
+    per-request directory walk; only new names are stat'ed and measured.
+    """
+
+    def __init__(self, directory: Path, url_prefix: str):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self._entries = {}
+        self._sorted = None
+        self._dir_mtime_ns = None
+        self._lock = asyncio.Lock()
+
+    def _describe(self, path: Path, stat_result: os.stat_result) -> dict:
+        width, height = read_dimensions(path)
+        return {
+            "filename": path.name,
+            "url": f"{self.url_prefix}/{path.name}",
+            "display_name": path.stem.replace("_", " ").title(),
+            "kind": UPLOAD_KINDS[path.suffix.lower()],
+            "size": stat_result.st_size,
+            "width": width,
+            "height": height,
+            "modified_at": datetime.fromtimestamp(stat_result.st_mtime, timezone.utc),
+        }
+
+    def _scan(self, known: dict):
+        try:
+            dir_mtime_ns = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}, None
+        entries = {}
+        with os.scandir(self.directory) as it:
+            for dir_entry in it:
+                name = dir_entry.name
+                if name.startswith(".") or Path(name).suffix.lower() not in UPLOAD_KINDS:
+                    continue
+                if name in known:
+                    entries[name] = known[name]
+                elif dir_entry.is_file():
+                    entries[name] = self._describe(Path(dir_entry.path), dir_entry.stat())
+        return entries, dir_mtime_ns
+
+    async def refresh(self, force: bool = False):
+        async with self._lock:
+            try:
+                dir_mtime_ns = self.directory.stat().st_mtime_ns
+            except FileNotFoundError:
+                dir_mtime_ns = None
+            if not force and dir_mtime_ns == self._dir_mtime_ns:
+                return
+            known = {} if force else self._entries
+            self._entries, self._dir_mtime_ns = await asyncio.to_thread(self._scan, known)
+            self._sorted = None
+
+    def add(self, path: Path):
+        """Record a file this worker just wrote"""
+        if path.suffix.lower() in UPLOAD_KINDS:
+            self._entries[path.name] = self._describe(path, path.stat())
+            self._sorted = None
+
+    async def list(self, kind: Optional[str] = None, offset: int = 0, limit: Optional[int] = None):
+        """Return (page, total) sorted by filename"""
+        await self.refresh()
+        if self._sorted is None:
+            self._sorted = sorted(self._entries.values(), key=lambda item: item["filename"])
+        items = self._sorted if kind is None else [item for item in self._sorted if item["kind"] == kind]
+        end = None if limit is None else offset + limit
+        return items[offset:end], len(items)
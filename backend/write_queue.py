@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from sqlalchemy import insert, select
+from metrics import pid_alive
+
+try:
+    import fcntl
+except ImportError:  # Windows runs a single uvicorn process, no locking needed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindQueue:
+    """Acknowledge inserts once they are durable in a spool file, then write them to the DB in batches.
+
+    Concurrent submissions share one spool write + fsync, and a background
+    task inserts queued rows in one transaction every `flush_interval`
+    seconds or once `max_batch` rows are waiting. Spools left behind by dead
+    processes are replayed at startup with INSERT OR IGNORE; a live process
+    holds a lock on its own spool, taken before the file gets its visible
+    name, so other workers leave it alone.
+
+    `on_insert(session, rows)`, if given, runs inside the same transaction as
+    each batch (and for replayed rows that were not committed before).
+    """
+
+    def __init__(self, model, session_factory, spool_dir: Path, datetime_fields=("created_at",),
+                 flush_interval: float = 0.05, max_batch: int = 200, on_insert=None):
+        self.model = model
+        self.session_factory = session_factory
+        self.spool_dir = spool_dir
+        self.datetime_fields = datetime_fields
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.on_insert = on_insert
+        self._spool = None
+        self._spool_lock = asyncio.Lock()
+        self._spool_waiters = []
+        self._spool_event = asyncio.Event()
+        self._pending: List[dict] = []
+        self._flush_event = asyncio.Event()
+        self._spooled = 0
+        self._committed = 0
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+    @property
+    def spool_path(self) -> Path:
+        return self.spool_dir / f"{self.model.__tablename__}-{os.getpid()}.jsonl"
+
+    async def start(self):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        await self._replay_orphaned_spools()
+        # Created and locked under a name the replay glob does not match, so
+        # no other worker can open it before the lock is held
+        tmp_path = self.spool_path.with_name(f".{self.spool_path.name}.tmp")
+        self._spool = open(tmp_path, "ab")
+        if fcntl:
+            fcntl.flock(self._spool.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.replace(tmp_path, self.spool_path)
+        self._running = True
+        self._tasks = [
+            asyncio.create_task(self._spool_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+        logger.info(f"Write-behind queue for {self.model.__tablename__} started ({self.spool_path.name})")
+
+    async def stop(self):
+        """Drain both loops, leaving anything that could not be committed in the spool"""
+        if not self._running:
+            return
+        self._running = False
+        spool_task, flush_task = self._tasks
+        self._spool_event.set()
+        await spool_task
+        self._flush_event.set()
+        await flush_task
+        drained = self._committed == self._spooled
+        if drained:
+            self._spool.truncate(0)
+        self._spool.close()
+        if drained:
+            self.spool_path.unlink(missing_ok=True)
+
+    async def submit(self, row: dict):
+        """Return once `row` is durable on disk; it reaches the DB shortly after"""
+        if not self._running:
+            # Not started or already stopped: nothing would spool it, write it through
+            async with self.session_factory() as session:
+                await self._insert(session, [row])
+                await session.commit()
+            return
+        line = json.dumps(row, default=_json_default).encode() + b"\n"
+        future = asyncio.get_running_loop().create_future()
+        self._spool_waiters.append((row, line, future))
+        self._spool_event.set()
+        await future
+
+    async def _spool_loop(self):
+        while self._running or self._spool_waiters:
+            await self._spool_event.wait()
+            self._spool_event.clear()
+            waiters, self._spool_waiters = self._spool_waiters, []
+            if not waiters:
+                continue
+            async with self._spool_lock:
+                try:
+                    await asyncio.to_thread(_append_and_sync, self._spool, b"".join(line for _, line, _ in waiters))
+                except Exception as e:
+                    for _, _, future in waiters:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                self._spooled += len(waiters)
+            self._pending.extend(row for row, _, _ in waiters)
+            if len(self._pending) >= self.max_batch:
+                self._flush_event.set()
+            for _, _, future in waiters:
+                if not future.done():
+                    future.set_result(None)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            while self._pending:
+                if not await self._flush_batch():
+                    break
+            if not self._running:
+                return
+
+    async def _flush_batch(self) -> bool:
+        batch = self._pending[:self.max_batch]
+        del self._pending[:len(batch)]
+        try:
+            async with self.session_factory() as session:
+                await self._insert(session, batch)
+                await session.commit()
+        except Exception as e:
+            # Keep the rows (they are still in the spool) and retry on the next tick
+            logger.error(f"Write-behind flush of {len(batch)} {self.model.__tablename__} rows failed: {e}")
+            self._pending[:0] = batch
+            return False
+        self._committed += len(batch)
+        async with self._spool_lock:
+            if self._committed == self._spooled:
+                await asyncio.to_thread(self._spool.truncate, 0)
+        return True
+
+    async def _replay_orphaned_spools(self):
+        prefix = f"{self.model.__tablename__}-"
+        for path in sorted(self.spool_dir.glob(f"{prefix}*.jsonl")):
+            pid = path.stem[len(prefix):]
+            if pid.isdigit() and int(pid) != os.getpid() and pid_alive(int(pid)):
+                continue  # owned by a live worker
+            try:
+                spool = open(path, "rb+")
+            except FileNotFoundError:
+                continue  # replayed by another worker meanwhile
+            with spool:
+                if fcntl:
+                    try:
+                        fcntl.flock(spool.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # being replayed by another worker
+                rows = [self._decode(line) for line in spool.read().splitlines() if line.strip()]
+                rows = [row for row in rows if row is not None]
+                if rows:
+                    async with self.session_factory() as session:
+                        result = await session.execute(
+                            select(self.model.id).where(self.model.id.in_([row["id"] for row in rows]))
+                        )
+                        committed = set(result.scalars())
+                        await self._insert(session, [row for row in rows if row["id"] not in committed])
+                        await session.commit()
+                    logger.info(f"Replayed {len(rows)} spooled {self.model.__tablename__} rows from {path.name}")
+                # Still under the lock, so nobody replays it a second time
+                path.unlink(missing_ok=True)
+
+    async def _insert(self, session, rows: List[dict]):
+        if not rows:
+            return
+        await session.execute(insert(self.model).prefix_with("OR IGNORE"), rows)
+        if self.on_insert is not None:
+            await self.on_insert(session, rows)
+
+    def _decode(self, line: bytes) -> Optional[dict]:
+        try:
+            row = json.loads(line)
+        except ValueError:
+            # A torn final line from a crash mid-write was never acknowledged
+            return None
+        for field in self.datetime_fields:
+            if row.get(field):
+                row[field] = datetime.fromisoformat(row[field])
+        return row
+
+def _append_and_sync(spool, data: bytes):
+    spool.write(data)
+    spool.flush()
+    os.fsync(spool.fileno())
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
@@ -16,6 +16,15 @@ if [ $? -eq 0 ]; then
     cp public/config.js build/config.js
     echo "✅ Runtime configuration copied to build directory"
     
+    # Precompress text assets; the backend serves the .gz/.br siblings directly
+    find build -type f \( -name '*.js' -o -name '*.css' -o -name '*.html' -o -name '*.json' -o -name '*.svg' -o -name '*.map' -o -name '*.txt' \) \
+        -size +1k -exec gzip -9 -k -f {} \;
+    if command -v brotli > /dev/null; then
+        find build -type f \( -name '*.js' -o -name '*.css' -o -name '*.html' -o -name '*.json' -o -name '*.svg' -o -name '*.map' -o -name '*.txt' \) \
+            -size +1k -exec brotli -f -k -q 11 {} \;
+    fi
+    echo "✅ Text assets precompressed (gzip$(command -v brotli > /dev/null && echo ' + brotli'))"
+    
     # Show build info
     echo ""
     echo "📁 Build Output:"
@@ -263,6 +263,15 @@ const detectLanguage = () => {
   return ['tr', 'en', 'de', 'ru'].includes(browserLang) ? browserLang : 'tr';
 };
 
+// Data inlined by the server's pre-rendered page; each key is used once, on first load
+const takePrerendered = (key, lang) => {
+  const data = window.__PRERENDERED__;
+  if (!data || data.lang !== lang || data[key] === undefined) return null;
+  const value = data[key];
+  delete data[key];
+  return value;
+};
+
 // Complete Services data (17 services)
 const servicesData = [
   {
@@ -783,12 +792,17 @@ const Blog = ({ currentLang }) => {
   const [posts, setPosts] = useState([]);
 
   useEffect(() => {
-    fetchBlogPosts();
-  }, []);
+    const prerendered = takePrerendered('blog', currentLang);
+    if (prerendered) {
+      setPosts(prerendered);
+    } else {
+      fetchBlogPosts();
+    }
+  }, [currentLang]);
 
   const fetchBlogPosts = async () => {
     try {
-      const response = await axios.get(`${API}/blog`);
+      const response = await axios.get(`${API}/blog`, { params: { lang: currentLang } });
       setPosts(response.data);
     } catch (error) {
       console.error('Error fetching blog posts:', error);
@@ -809,12 +823,12 @@ const Blog = ({ currentLang }) => {
               <Card key={post.id} className="hover:shadow-lg transition-shadow">
                 <CardHeader>
                   <CardTitle className="text-navy-900">
-                    {post[`title_${currentLang}`] || post.title_tr}
+                    {post.title}
                   </CardTitle>
                 </CardHeader>
                 <CardContent>
                   <p className="text-gray-600 mb-4 line-clamp-3">
-                    {(post[`content_${currentLang}`] || post.content_tr).substring(0, 150)}...
+                    {post.content.substring(0, 150)}...
                   </p>
                   <Link to={`/blog/${post.slug}`}>
                     <Button variant="outline" size="sm">
@@ -842,16 +856,25 @@ const BlogDetail = () => {
   });
 
   useEffect(() => {
-    fetchPost();
+    const prerendered = takePrerendered('post', currentLang);
+    if (prerendered && prerendered.slug === slug) {
+      setPost(prerendered);
+      setLoading(false);
+    } else {
+      fetchPost();
+    }
   }, [slug]);
 
   const fetchPost = async () => {
     try {
-      const response = await axios.get(`${API}/blog`);
-      const foundPost = response.data.find(p => p.slug === slug);
-      setPost(foundPost);
+      const response = await axios.get(`${API}/blog/by-slug/${encodeURIComponent(slug)}`, {
+        params: { lang: currentLang }
+      });
+      setPost(response.data);
     } catch (error) {
-      console.error('Error fetching post:', error);
+      if (error.response?.status !== 404) {
+        console.error('Error fetching post:', error);
+      }
     } finally {
       setLoading(false);
     }
@@ -881,7 +904,7 @@ const BlogDetail = () => {
         <Card>
           <CardHeader>
             <CardTitle className="text-3xl text-navy-900">
-              {post[`title_${currentLang}`] || post.title_tr}
+              {post.title}
             </CardTitle>
             <p className="text-gray-500">
               {new Date(post.created_at).toLocaleDateString('tr-TR')}
@@ -889,7 +912,7 @@ const BlogDetail = () => {
           </CardHeader>
           <CardContent>
             <div className="prose prose-lg max-w-none">
-              {(post[`content_${currentLang}`] || post.content_tr).split('\n').map((paragraph, index) => (
+              {post.content.split('\n').map((paragraph, index) => (
                 <p key={index} className="mb-4 text-gray-700 leading-relaxed">
                   {paragraph}
                 </p>
@@ -1155,7 +1178,14 @@ const MainWebsite = () => {
 
   useEffect(() => {
     localStorage.setItem('preferred-language', currentLang);
-    fetchSiteSettings();
+    // Lets the server pick the pre-rendered page in this language
+    document.cookie = `preferred-language=${currentLang}; path=/; max-age=31536000; samesite=lax`;
+    const prerendered = takePrerendered('settings', currentLang);
+    if (prerendered) {
+      setSiteSettings(prerendered);
+    } else {
+      fetchSiteSettings();
+    }
   }, [currentLang]);
 
   // Update favicon when site settings change
@@ -22,6 +22,85 @@ const getApiUrl = () => {
 const BACKEND_URL = getBackendUrl();
 const API = getApiUrl();
 
+// Admin session token: kept for the browser tab and sent with every request
+const SESSION_TOKEN_KEY = "admin-session-token";
+
+const setSessionToken = (token) => {
+  if (token) {
+    sessionStorage.setItem(SESSION_TOKEN_KEY, token);
+    axios.defaults.headers.common["Authorization"] = `Bearer ${token}`;
+  } else {
+    sessionStorage.removeItem(SESSION_TOKEN_KEY);
+    delete axios.defaults.headers.common["Authorization"];
+  }
+};
+
+const adminLogin = async (username, password) => {
+  const response = await axios.post(`${API}/admin/login`, { username, password });
+  setSessionToken(response.data.token);
+};
+
+// Live inbox events (Server-Sent Events). Read with fetch rather than
+// EventSource, which cannot send the Authorization header. Reconnects with
+// Last-Event-ID so only missed events are replayed.
+const MESSAGE_EVENTS_RETRY_MS = 3000;
+
+const subscribeMessageEvents = (lastEventId, onEvent) => {
+  const controller = new AbortController();
+  let position = lastEventId;
+
+  const dispatch = (block) => {
+    let type = "message";
+    let data = "";
+    block.split("\n").forEach((line) => {
+      const colon = line.indexOf(":");
+      if (colon <= 0) return; // comments and malformed lines
+      const field = line.slice(0, colon);
+      const value = line.slice(colon + 1).replace(/^ /, "");
+      if (field === "id") position = value;
+      else if (field === "event") type = value;
+      else if (field === "data") data += value;
+    });
+    if (data) onEvent(type, JSON.parse(data));
+  };
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const response = await fetch(`${API}/messages/events`, {
+          headers: {
+            Authorization: axios.defaults.headers.common["Authorization"],
+            ...(position ? { "Last-Event-ID": position } : {}),
+          },
+          signal: controller.signal,
+        });
+        if (response.status === 401) return;
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        for (;;) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let boundary;
+          while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+            dispatch(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+          }
+        }
+      } catch (error) {
+        if (controller.signal.aborted) return;
+        console.error("Message events disconnected:", error);
+      }
+      await new Promise((resolve) => setTimeout(resolve, MESSAGE_EVENTS_RETRY_MS));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+};
+
 // Admin Setup Component
 const AdminSetup = ({ onSetupComplete }) => {
   const [setupData, setSetupData] = useState({
@@ -54,8 +133,9 @@ const AdminSetup = ({ onSetupComplete }) => {
         password: setupData.password
       });
       
+      await adminLogin(setupData.username, setupData.password);
       alert("Admin hesabı başarıyla oluşturuldu!");
-      onSetupComplete(setupData.username, setupData.password);
+      onSetupComplete();
     } catch (error) {
       console.error("Admin setup error:", error);
       setError(error.response?.data?.detail || "Hesap oluşturulurken hata oluştu");
@@ -131,10 +211,7 @@ const AdminLogin = ({ onLoginSuccess }) => {
     setError("");
 
     try {
-      await axios.post(`${API}/admin/login`, {
-        username: loginData.username,
-        password: loginData.password
-      });
+      await adminLogin(loginData.username, loginData.password);
       
       onLoginSuccess();
     } catch (error) {
@@ -188,18 +265,59 @@ const AdminLogin = ({ onLoginSuccess }) => {
 };
 
 // Messages Management Component
+const MESSAGES_PAGE_SIZE = 50;
+
 const MessagesManager = () => {
   const [messages, setMessages] = useState([]);
+  const [stats, setStats] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
-    fetchMessages();
+    let unsubscribe = null;
+    let cancelled = false;
+    const load = async () => {
+      fetchStats();
+      // Events after the first page was read are replayed by the stream
+      const lastEventId = await fetchMessages();
+      if (!cancelled) {
+        unsubscribe = subscribeMessageEvents(lastEventId, handleMessageEvent);
+      }
+    };
+    load();
+    return () => {
+      cancelled = true;
+      if (unsubscribe) unsubscribe();
+    };
   }, []);
 
-  const fetchMessages = async () => {
+  const handleMessageEvent = (type, data) => {
+    switch (type) {
+      case "message.created":
+        setMessages(prev => prev.some(msg => msg.id === data.id) ? prev : [data, ...prev]);
+        break;
+      case "message.read":
+        setMessages(prev => prev.map(msg => msg.id === data.id ? { ...msg, is_read: true } : msg));
+        break;
+      case "message.deleted":
+        setMessages(prev => prev.filter(msg => msg.id !== data.id));
+        break;
+      default:
+        // Bulk changes, or a position too old to replay
+        fetchMessages();
+    }
+    fetchStats();
+  };
+
+  const fetchMessages = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/messages`);
-      setMessages(response.data);
+      const response = await axios.get(`${API}/messages`, {
+        params: { limit: MESSAGES_PAGE_SIZE, ...(cursor ? { cursor } : {}) }
+      });
+      setMessages(prev => cursor ? [...prev, ...response.data] : response.data);
+      setNextCursor(response.headers["x-next-cursor"] || null);
+      return response.headers["x-last-event-id"] || null;
     } catch (error) {
       console.error("Error fetching messages:", error);
     } finally {
@@ -207,12 +325,38 @@ const MessagesManager = () => {
     }
   };
 
+  const fetchStats = async () => {
+    try {
+      const response = await axios.get(`${API}/messages/stats`);
+      setStats(response.data);
+    } catch (error) {
+      console.error("Error fetching message stats:", error);
+    }
+  };
+
+  const markAllAsRead = async () => {
+    try {
+      await axios.post(`${API}/messages/bulk`, { action: "mark_read", filter: { is_read: false } });
+      setMessages(messages.map(msg => ({ ...msg, is_read: true })));
+      fetchStats();
+    } catch (error) {
+      console.error("Error marking messages as read:", error);
+    }
+  };
+
+  const loadMore = async () => {
+    setLoadingMore(true);
+    await fetchMessages(nextCursor);
+    setLoadingMore(false);
+  };
+
   const deleteMessage = async (messageId) => {
     if (!confirm("Bu mesajı silmek istediğinizden emin misiniz?")) return;
 
     try {
       await axios.delete(`${API}/messages/${messageId}`);
       setMessages(messages.filter(msg => msg.id !== messageId));
+      fetchStats();
       alert("Mesaj başarıyla silindi!");
     } catch (error) {
       console.error("Error deleting message:", error);
@@ -226,6 +370,7 @@ const MessagesManager = () => {
       setMessages(messages.map(msg => 
         msg.id === messageId ? { ...msg, is_read: true } : msg
       ));
+      fetchStats();
     } catch (error) {
       console.error("Error marking message as read:", error);
     }
@@ -260,7 +405,19 @@ const MessagesManager = () => {
 
   return (
     <div className="space-y-4">
-      <h3 className="text-2xl font-bold text-navy-900">Gelen Mesajlar ({messages.length})</h3>
+      <div className="flex justify-between items-center">
+        <h3 className="text-2xl font-bold text-navy-900">
+          Gelen Mesajlar ({stats ? stats.total : messages.length})
+          {stats && stats.unread > 0 && (
+            <span className="ml-2 text-base font-normal text-gray-600">{stats.unread} okunmamış</span>
+          )}
+        </h3>
+        {stats && stats.unread > 0 && (
+          <Button size="sm" variant="outline" onClick={markAllAsRead}>
+            Tümünü Okundu İşaretle
+          </Button>
+        )}
+      </div>
       
       {messages.length === 0 ? (
         <Card>
@@ -319,6 +476,14 @@ const MessagesManager = () => {
           </Card>
         ))
       )}
+
+      {nextCursor && (
+        <div className="text-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Yükleniyor..." : "Daha Fazla Yükle"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 };
@@ -868,10 +1033,12 @@ const PasswordSettings = () => {
     setMessage('');
 
     try {
-      await axios.post(`${API}/admin/change-password`, {
+      const response = await axios.post(`${API}/admin/change-password`, {
         current_password: passwordData.currentPassword,
         new_password: passwordData.newPassword
       });
+      // Changing the password revokes the old session token
+      setSessionToken(response.data.token);
       
       setMessage('Şifre başarıyla değiştirildi!');
       setPasswordData({ currentPassword: '', newPassword: '', confirmPassword: '' });
@@ -1185,13 +1352,29 @@ const BlogManager = () => {
 // Main Admin Panel Component
 const AdminPanel = () => {
   const [hasAdmin, setHasAdmin] = useState(null);
-  const [isLoggedIn, setIsLoggedIn] = useState(false);
+  const [isLoggedIn, setIsLoggedIn] = useState(() => {
+    const token = sessionStorage.getItem(SESSION_TOKEN_KEY);
+    setSessionToken(token);
+    return Boolean(token);
+  });
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     checkAdminSetup();
   }, []);
 
+  useEffect(() => {
+    // An expired or rejected session sends the admin back to the login form
+    const interceptor = axios.interceptors.response.use(undefined, (error) => {
+      if (error.response?.status === 401 && sessionStorage.getItem(SESSION_TOKEN_KEY)) {
+        setSessionToken(null);
+        setIsLoggedIn(false);
+      }
+      return Promise.reject(error);
+    });
+    return () => axios.interceptors.response.eject(interceptor);
+  }, []);
+
   const checkAdminSetup = async () => {
     try {
       const response = await axios.get(`${API}/admin/check-setup`);
@@ -1203,7 +1386,7 @@ const AdminPanel = () => {
     }
   };
 
-  const handleSetupComplete = (username, password) => {
+  const handleSetupComplete = () => {
     setHasAdmin(true);
     setIsLoggedIn(true);
   };
@@ -1213,6 +1396,7 @@ const AdminPanel = () => {
   };
 
   const handleLogout = () => {
+    setSessionToken(null);
     setIsLoggedIn(false);
   };
 